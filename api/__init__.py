@@ -1,6 +1,19 @@
 #!/usr/bin/env python3
 """API module for fetching sports data."""
 
-from .sports_api import fetch_scores
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .sports_api import fetch_scores
 
 __all__ = ["fetch_scores"]
+
+
+def __getattr__(name: str) -> Any:
+    # Imported on first use, requests is slow to import on the Pi
+    if name != "fetch_scores":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = importlib.import_module(".sports_api", __name__).fetch_scores
+    globals()[name] = value
+    return value
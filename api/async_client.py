@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Asyncio versions of the score fetch and badge downloads (requires aiohttp)."""
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+import aiohttp
+
+import config
+from models import Event, SportsData
+from utils import metrics, resilience
+from utils.image_utils import flatten_image, image_cache_path
+
+from . import score_feed
+from .json_stream import ArrayItemStream
+from .score_feed import ScoreUpdate
+from .sports_api import (
+    STREAM_CHUNK_SIZE,
+    in_display_window,
+    merge_events,
+    parse_changes,
+    parse_event,
+    parse_events,
+    subscribe,
+)
+
+logger = logging.getLogger(__name__)
+
+# Both the upstream API and the badge host are hit repeatedly, keep the connections open
+CONNECTION_LIMIT = 8
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+
+def create_session() -> aiohttp.ClientSession:
+    """Create the shared HTTP client session with connection pooling."""
+    connector = aiohttp.TCPConnector(limit=CONNECTION_LIMIT, keepalive_timeout=60)
+    return aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT)
+
+
+async def get_or_download_image_async(
+    session: aiohttp.ClientSession, url: str, save_dir: Path
+) -> Path | None:
+    """
+    Download an image from URL unless it is already cached.
+    Same caching rules as utils.get_or_download_image().
+
+    Args:
+        session: The shared HTTP client session
+        url: The URL of the image to download
+        save_dir: Directory to save the image
+
+    Returns:
+        Path to the downloaded image, or None if download failed
+    """
+    if not url:
+        return None
+
+    save_dir.mkdir(parents=True, exist_ok=True)
+    filepath = image_cache_path(url, save_dir)
+
+    if filepath.exists():
+        metrics.BADGE_LOOKUPS.inc(result="hit")
+        return filepath
+
+    breaker = resilience.breaker_for(url)
+    if resilience.failed_badges.is_blocked(url) or not breaker.allow():
+        metrics.BADGE_LOOKUPS.inc(result="skipped")
+        return None
+
+    # Written next to the cache file, so a failed download is never cached
+    partial = filepath.with_name(filepath.name + ".part")
+    try:
+        timeout = aiohttp.ClientTimeout(total=config.BADGE_TIMEOUT)
+        async with session.get(url, timeout=timeout) as response:
+            response.raise_for_status()
+            with open(partial, "wb") as f:
+                async for chunk in response.content.iter_chunked(8192):
+                    f.write(chunk)
+        os.replace(partial, filepath)
+
+        breaker.record_success()
+        flatten_image(filepath)
+        metrics.BADGE_LOOKUPS.inc(result="miss")
+        return filepath
+
+    except aiohttp.ClientResponseError as e:
+        # The host answered, only this badge is missing or broken
+        breaker.record_success()
+        resilience.failed_badges.add(url, missing=e.status in (404, 410))
+        metrics.BADGE_LOOKUPS.inc(result="error")
+        logger.error("Error downloading image", extra={"url": url, "error": e})
+        return None
+
+    # asyncio.TimeoutError is only the builtin TimeoutError from Python 3.11
+    except (asyncio.TimeoutError, aiohttp.ClientError, OSError) as e:  # noqa: UP041
+        partial.unlink(missing_ok=True)
+        if isinstance(e, (asyncio.TimeoutError, aiohttp.ClientError)):
+            breaker.record_failure()
+            resilience.failed_badges.add(url)
+        metrics.BADGE_LOOKUPS.inc(result="error")
+        logger.error(
+            "Error downloading or saving image",
+            extra={"url": url, "path": filepath, "error": e},
+        )
+        return None
+
+
+async def _attach_badges_async(
+    session: aiohttp.ClientSession, events: list[Event]
+) -> None:
+    """Download the team and league badges of all events concurrently."""
+    # Events share badges (same league, same team twice a week), download each once
+    teams_dir = config.IMAGES_DIR / "teams"
+    leagues_dir = config.IMAGES_DIR / "leagues"
+    wanted = set()
+    for event in events:
+        wanted.add((event.team_one.badge, teams_dir))
+        wanted.add((event.team_two.badge, teams_dir))
+        wanted.add((event.league_badge, leagues_dir))
+
+    keys = list(wanted)
+    paths = await asyncio.gather(
+        *(get_or_download_image_async(session, url, save_dir) for url, save_dir in keys)
+    )
+    downloaded = dict(zip(keys, paths, strict=True))
+
+    for event in events:
+        event.team_one.badge_path = downloaded[(event.team_one.badge, teams_dir)]
+        event.team_two.badge_path = downloaded[(event.team_two.badge, teams_dir)]
+        event.league_badge_path = downloaded[(event.league_badge, leagues_dir)]
+
+
+async def _read_events_streamed(response: aiohttp.ClientResponse) -> list[Event]:
+    """Parse the events array item by item as the body arrives."""
+    stream = ArrayItemStream("events")
+    events = []
+    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+        for event_data in stream.feed(chunk):
+            event = parse_event(event_data)
+            if in_display_window(event):
+                events.append(event)
+    stream.close()
+    return events
+
+
+async def _fetch_source_async(
+    session: aiohttp.ClientSession, url: str
+) -> list[Event] | None:
+    """
+    The events of a single source: as pushed by its stream while subscribed,
+    otherwise fetched (only the changes if the source supports deltas), unless
+    its host's circuit breaker is open.
+
+    Args:
+        session: The shared HTTP client session
+        url: The source URL
+
+    Returns:
+        List of events to display (badges of new events not yet attached), or
+        None if request fails.
+    """
+    feed = score_feed.feed_for(url)
+    if config.API_STREAM:
+        # The subscription runs in a thread, as in the sync runtime
+        subscribe(feed)
+        if feed.streaming.is_set():
+            return feed.current()
+
+    breaker = resilience.breaker_for(url)
+    if not breaker.allow():
+        logger.warning("Skipping source, circuit open", extra={"url": url})
+        return None
+
+    since = feed.cursor if config.DELTA_UPDATES else None
+    update = await _request_source_async(session, url, since)
+    if update is None:
+        breaker.record_failure()
+        return None
+    breaker.record_success()
+    metrics.SCORE_UPDATES.inc(kind="delta" if update.delta else "full")
+    return feed.apply(update)
+
+
+async def _request_source_async(
+    session: aiohttp.ClientSession, url: str, since: str | None = None
+) -> ScoreUpdate | None:
+    """
+    Fetch and parse the events of a single source within SOURCE_TIMEOUT.
+
+    Args:
+        session: The shared HTTP client session
+        url: The source URL
+        since: Cursor of the last response, to get only the changes since
+
+    Returns:
+        All events to display or the changes (badges not yet attached), or None
+        if request fails.
+    """
+    params = {"since": since} if since else None
+    try:
+        timeout = aiohttp.ClientTimeout(total=config.SOURCE_TIMEOUT)
+        async with session.get(url, params=params, timeout=timeout) as response:
+            if since and response.status == 410:
+                logger.info("Score cursor expired, fetching all", extra={"url": url})
+                return await _request_source_async(session, url)
+            response.raise_for_status()
+            cursor = response.headers.get(score_feed.CURSOR_HEADER)
+
+            if response.headers.get(score_feed.DELTA_HEADER):
+                data = await response.json(content_type=None)
+                with metrics.PARSE_SECONDS.time():
+                    events, deleted = parse_changes(data)
+                return ScoreUpdate(events, cursor, delta=True, deleted=deleted)
+
+            if config.STREAM_PARSE:
+                with metrics.PARSE_SECONDS.time():
+                    return ScoreUpdate(await _read_events_streamed(response), cursor)
+
+            data = await response.json(content_type=None)
+            with metrics.PARSE_SECONDS.time():
+                return ScoreUpdate(parse_events(data), cursor)
+    except asyncio.TimeoutError:  # noqa: UP041
+        logger.error("API request timed out", extra={"url": url})
+        return None
+
+    except aiohttp.ClientError as e:
+        logger.error("Error fetching scores from API", extra={"url": url, "error": e})
+        return None
+
+    except (KeyError, ValueError, TypeError) as e:
+        logger.error("Error parsing API response data", extra={"url": url, "error": e})
+        return None
+
+
+async def fetch_scores_async(session: aiohttp.ClientSession) -> SportsData | None:
+    """
+    Fetch sports scores from the API without blocking the event loop.
+    When several sources are configured they are fetched concurrently and merged.
+
+    Args:
+        session: The shared HTTP client session
+
+    Returns:
+        SportsData object containing events, or None if request fails.
+    """
+    with metrics.FETCH_SECONDS.time():
+        data = await _fetch_scores_async(session)
+    metrics.FETCH_TOTAL.inc(result="ok" if data else "error")
+    return data
+
+
+async def _fetch_scores_async(session: aiohttp.ClientSession) -> SportsData | None:
+    # The sources of this fetch, a reload may replace the list meanwhile
+    sources = config.API_SOURCES
+    if not sources:
+        logger.error("API_URL not configured in .env file")
+        return None
+
+    # (url, events) in the order the sources answered
+    answered: list[tuple[str, list[Event]]] = []
+
+    async def fetch(url: str) -> None:
+        events = await _fetch_source_async(session, url)
+        if events is not None:
+            answered.append((url, events))
+
+    await asyncio.gather(*(fetch(url) for url in sources))
+
+    if not answered:
+        return None
+
+    if config.SOURCE_PRECEDENCE != "fastest":
+        answered.sort(key=lambda result: sources.index(result[0]))
+    events = merge_events([events for _url, events in answered])
+
+    await _attach_badges_async(session, events)
+
+    return SportsData(events=events)
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Fan-out hub: one board polls the upstream API and serves the parsed scores
+and badges to the other boards on the LAN.
+
+Protocol (plain HTTP/JSON, same shape as the upstream API):
+    GET /scores                 -> current scores, X-Hub-Version header
+    GET /scores?since=<version> -> long-poll, returns when the version changes
+                                   (304 if nothing changed within HUB_WAIT_TIME)
+    GET /badges/<kind>/<file>   -> a cached badge image (kind: teams or leagues)
+"""
+
+import json
+import logging
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urljoin, urlparse
+
+import requests
+
+from config import IMAGES_DIR
+from models import Event, SportsData, Team
+from utils.resilience import Backoff
+
+from .sports_api import attach_badges, parse_events
+
+logger = logging.getLogger(__name__)
+
+# Seconds a long-poll request is held open before answering "not modified"
+HUB_WAIT_TIME = 30
+# A peer that heard nothing from the hub for this long (a long-poll answers at
+# least every HUB_WAIT_TIME) treats its scores as a failed fetch
+HUB_STALE_AFTER = HUB_WAIT_TIME + 15
+BADGE_KINDS = ("teams", "leagues")
+BADGE_FILENAME = re.compile(r"^[0-9a-f]{32}\.(png|jpg|jpeg|gif|bmp)$")
+
+
+def _badge_url(path: Path | None, kind: str) -> str:
+    """The hub-relative URL a peer downloads a cached badge from."""
+    return f"/badges/{kind}/{path.name}" if path else ""
+
+
+def _team_payload(team: Team) -> dict[str, Any]:
+    return {
+        "id": team.id,
+        "badge": _badge_url(team.badge_path, "teams"),
+        "location": team.location,
+        "name": team.name,
+        "abbreviation": team.abbreviation,
+        "score": team.score,
+    }
+
+
+def _event_payload(event: Event) -> dict[str, Any]:
+    return {
+        "id": event.id,
+        "date": event.date,
+        "time": event.time,
+        "status": event.status,
+        "status_type": event.status_type,
+        "league": event.league,
+        "league_badge": _badge_url(event.league_badge_path, "leagues"),
+        "team_one": _team_payload(event.team_one),
+        "team_two": _team_payload(event.team_two),
+    }
+
+
+def lan_address() -> str:
+    """
+    The board's address on the LAN: the one its traffic to the internet leaves
+    from (no packet is sent). Empty, for every interface, if there is no route.
+    """
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect(("192.0.2.1", 80))
+            return str(sock.getsockname()[0])
+    except OSError:
+        logger.warning("No LAN address found, the hub listens on every interface")
+        return ""
+
+
+def serialize_scores(data: SportsData) -> bytes:
+    """Encode scores in the upstream API format, pointing badges at the hub."""
+    payload = {"events": [_event_payload(event) for event in data.events]}
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+class ScoreHub:
+    """
+    Serves the latest scores and badges to peer boards, on `port` at the `bind`
+    address (the LAN address if empty).
+    """
+
+    def __init__(self, port: int, bind: str = "") -> None:
+        self.version = 0
+        self.payload = serialize_scores(SportsData(events=[]))
+        self.changed = threading.Condition()
+
+        hub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                hub._handle(self)
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                # Peers long-poll constantly, keep the journal quiet
+                pass
+
+        self.server = ThreadingHTTPServer((bind or lan_address(), port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="score-hub", daemon=True
+        )
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        self.thread.start()
+        address, port = self.server.server_address[:2]
+        logger.info("Score hub listening", extra={"address": address, "port": port})
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def publish(self, data: SportsData) -> None:
+        """Share new scores, waking up waiting peers if anything changed."""
+        payload = serialize_scores(data)
+        with self.changed:
+            if payload == self.payload:
+                return
+            self.payload = payload
+            self.version += 1
+            self.changed.notify_all()
+
+    def _handle(self, request: BaseHTTPRequestHandler) -> None:
+        url = urlparse(request.path)
+        if url.path == "/scores":
+            self._send_scores(request, parse_qs(url.query).get("since"))
+        elif url.path.startswith("/badges/"):
+            self._send_badge(request, url.path.split("/")[2:])
+        else:
+            request.send_error(404)
+
+    def _send_scores(
+        self, request: BaseHTTPRequestHandler, since: list[str] | None
+    ) -> None:
+        # Nothing published yet, make first-time peers wait like a long-poll
+        if not since and self.version == 0:
+            since = ["0"]
+
+        with self.changed:
+            if since:
+                known = int(since[0]) if since[0].isdigit() else -1
+                self.changed.wait_for(lambda: self.version != known, HUB_WAIT_TIME)
+                if self.version == known:
+                    request.send_response(304)
+                    request.send_header("X-Hub-Version", str(self.version))
+                    request.end_headers()
+                    return
+            version, payload = self.version, self.payload
+
+        request.send_response(200)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(payload)))
+        request.send_header("X-Hub-Version", str(version))
+        request.end_headers()
+        request.wfile.write(payload)
+
+    def _send_badge(self, request: BaseHTTPRequestHandler, parts: list[str]) -> None:
+        # Only serve files from the badge cache, never arbitrary paths
+        if len(parts) != 2 or parts[0] not in BADGE_KINDS:
+            request.send_error(404)
+            return
+        if not BADGE_FILENAME.match(parts[1]):
+            request.send_error(404)
+            return
+
+        filepath = IMAGES_DIR / parts[0] / parts[1]
+        try:
+            body = filepath.read_bytes()
+        except OSError:
+            request.send_error(404)
+            return
+
+        request.send_response(200)
+        request.send_header("Content-Type", "application/octet-stream")
+        request.send_header("Content-Length", str(len(body)))
+        request.send_header("Cache-Control", "max-age=86400")
+        request.end_headers()
+        request.wfile.write(body)
+
+
+class HubClient:
+    """Receives scores pushed from a hub instead of polling the upstream API."""
+
+    def __init__(self, hub_url: str) -> None:
+        self.hub_url = hub_url.rstrip("/") + "/"
+        self.version: str | None = None
+        self.latest: SportsData | None = None
+        # Set when newer scores arrive, cleared when fetch_scores() hands them out
+        self.received = threading.Event()
+        # Monotonic time of the last answer from the hub (scores or "not modified")
+        self.heard_at = 0.0
+        # Cleared while the board sleeps
+        self.active = threading.Event()
+        self.active.set()
+        self.thread = threading.Thread(
+            target=self._listen, name="hub-client", daemon=True
+        )
+
+    def start(self) -> None:
+        """Start listening for pushed updates in a background thread."""
+        self.thread.start()
+        logger.info("Receiving scores from hub", extra={"hub": self.hub_url})
+
+    def pause(self) -> None:
+        """Stop polling the hub (sleep mode), resume() starts again."""
+        self.active.clear()
+        self.received.clear()
+
+    def resume(self) -> None:
+        # Ask for the current scores right away instead of long-polling
+        self.version = None
+        self.active.set()
+
+    def is_stale(self) -> bool:
+        """Whether the hub has not answered for HUB_STALE_AFTER seconds."""
+        return time.monotonic() - self.heard_at > HUB_STALE_AFTER
+
+    def fetch_scores(self) -> SportsData | None:
+        """
+        Return the latest scores received from the hub.
+        Waits briefly for an update after startup or waking up.
+
+        Returns:
+            SportsData object containing events, or None if nothing arrived
+            yet or the hub stopped answering.
+        """
+        if self.latest is None or self.is_stale():
+            self.received.wait(timeout=10)
+        self.received.clear()
+        if self.latest is None or self.is_stale():
+            logger.warning(
+                "No recent scores from hub",
+                extra={"hub": self.hub_url, "stale_after": HUB_STALE_AFTER},
+            )
+            return None
+        return self.latest
+
+    def _listen(self) -> None:
+        retry = Backoff()
+        while True:
+            self.active.wait()
+            try:
+                self._poll_once()
+                retry.reset()
+            except (requests.RequestException, ValueError, TypeError) as e:
+                retry_in = retry.next_delay()
+                logger.error(
+                    "Error receiving scores from hub",
+                    extra={"error": e, "retry_in": round(retry_in)},
+                )
+                time.sleep(retry_in)
+
+    def _poll_once(self) -> None:
+        params = {"since": self.version} if self.version is not None else None
+        response = requests.get(
+            urljoin(self.hub_url, "scores"),
+            params=params,
+            timeout=HUB_WAIT_TIME + 10,
+        )
+        response.raise_for_status()
+        self.heard_at = time.monotonic()
+        self.version = response.headers.get("X-Hub-Version", self.version)
+        if response.status_code == 304:
+            return
+
+        events = parse_events(response.json())
+        for event in events:
+            # Badges are hub-relative, download them from the hub itself
+            event.team_one.badge = self._absolute(event.team_one.badge)
+            event.team_two.badge = self._absolute(event.team_two.badge)
+            event.league_badge = self._absolute(event.league_badge)
+            attach_badges(event)
+
+        self.latest = SportsData(events=events)
+        self.received.set()
+        logger.info(
+            "Received scores from hub",
+            extra={"events": len(events), "version": self.version},
+        )
+
+    def _absolute(self, url: str) -> str:
+        return urljoin(self.hub_url, url) if url else ""
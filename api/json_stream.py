@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Incremental parsing of one array inside a large JSON document."""
+
+import codecs
+import json
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+WHITESPACE = " \t\r\n"
+# What a chunk can end in the middle of, besides a string
+LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+def _is_incomplete(text: str, error: json.JSONDecodeError) -> bool:
+    """Whether a decode error is only the end of the text cutting a value short."""
+    tail = text[error.pos :]
+    if not tail or error.msg.startswith("Unterminated string"):
+        return True
+    if error.msg == "Expecting value":
+        return any(literal.startswith(tail) for literal in LITERALS)
+    if error.msg.startswith("Invalid \\uXXXX escape"):
+        return len(tail) < 6
+    # A number cut after its sign, decimal point or exponent
+    return set(tail) <= NUMBER_CHARS
+
+
+class ArrayItemStream:
+    """
+    Incrementally decodes the items of a top-level array in a JSON object,
+    e.g. the "events" in {"events": [{...}, {...}]}, as the bytes arrive.
+
+    Only the item being decoded is held in memory, never the whole document.
+    Items are expected to be objects or arrays (a number split across two
+    chunks could otherwise be decoded early).
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        # Characters of the document dropped from the start of the buffer
+        self.offset = 0
+        self.state = "search"  # "search" for the key, then "items", then "done"
+
+        # Scanner state while searching for the key
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.string_start = 0
+        self.last_string: str | None = None
+        self.key_matched = False
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """
+        Add the next chunk of the document.
+
+        Args:
+            chunk: Raw bytes of the response body
+
+        Returns:
+            The array items completed by this chunk
+        """
+        if self.state == "done":
+            return []
+        self.buffer += self.utf8.decode(chunk)
+        if self.state == "search":
+            self._search()
+        return self._decode_items() if self.state == "items" else []
+
+    def close(self) -> None:
+        """Finish the document, raising ValueError if the array was cut short."""
+        if self.state == "items":
+            raise ValueError(f'Truncated JSON: "{self.key}" array is not closed')
+
+    def _search(self) -> None:
+        """Scan for the key at depth 1 followed by the opening bracket."""
+        buffer = self.buffer
+        pos = self.pos
+        while pos < len(buffer):
+            ch = buffer[pos]
+            pos += 1
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        self.last_string = buffer[self.string_start : pos - 1]
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                self.string_start = pos
+            elif ch == ":":
+                self.key_matched = self.depth == 1 and self.last_string == self.key
+            elif ch == ",":
+                self.last_string = None
+                self.key_matched = False
+            elif ch in "[{":
+                if ch == "[" and self.key_matched:
+                    # Found it, drop everything before the first item
+                    self.state = "items"
+                    self.buffer = buffer[pos:]
+                    self.offset += pos
+                    self.pos = 0
+                    return
+                self.depth += 1
+                self.key_matched = False
+            elif ch in "]}":
+                self.depth -= 1
+                if self.depth == 0:
+                    # End of the document without the key
+                    self.state = "done"
+                    break
+            elif ch not in WHITESPACE:
+                self.key_matched = False
+        self.pos = pos
+
+    def _decode_items(self) -> list[Any]:
+        items = []
+        buffer = self.buffer
+        pos = self.pos
+        while True:
+            # Skip separators between items
+            while pos < len(buffer) and buffer[pos] in WHITESPACE + ",":
+                pos += 1
+            if pos >= len(buffer):
+                break
+
+            if buffer[pos] == "]":
+                self.state = "done"
+                break
+
+            try:
+                item, pos = self.decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if _is_incomplete(buffer, e):
+                    # Item not complete yet, wait for more data
+                    break
+                raise ValueError(
+                    f'Invalid JSON in "{self.key}" array: {e.msg} '
+                    f"at char {self.offset + e.pos}"
+                ) from e
+            items.append(item)
+
+        # Release the decoded text, once per chunk
+        self.offset += pos
+        self.buffer = "" if self.state == "done" else buffer[pos:]
+        self.pos = 0
+        return items
+
+
+def iter_array_items(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """
+    Yield the items of the array under `key` from a chunked JSON document.
+
+    Args:
+        chunks: The document bytes, e.g. response.iter_content()
+        key: Name of the top-level array
+
+    Yields:
+        Each decoded item, as soon as it is complete
+    """
+    stream = ArrayItemStream(key)
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+    stream.close()
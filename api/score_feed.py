@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+The events of each score source, kept up to date from full responses, deltas
+and pushed updates.
+
+Delta protocol (optional, a source that does not speak it is polled in full):
+    GET <source>                  -> all events, X-Scores-Cursor header
+    GET <source>?since=<cursor>   -> {"events": [changed], "deleted": [ids]}
+                                     with X-Scores-Delta: 1 and the new cursor
+                                     (410 if the cursor is no longer known)
+    GET <source>/stream           -> Server-Sent Events: "scores" (all events)
+                                     or "delta" messages, the SSE id is the
+                                     cursor (resumed with Last-Event-ID)
+
+Known events are updated in place (Event.update), so a rotation already on
+screen shows a new score the next time the game comes up.
+"""
+
+import threading
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit, urlunsplit
+
+from models import Event
+
+CURSOR_HEADER = "X-Scores-Cursor"
+DELTA_HEADER = "X-Scores-Delta"
+
+
+def event_key(event: Event) -> object:
+    """What identifies an event across responses and sources."""
+    # Events without an id can only be matched on what they describe
+    return event.id or (
+        event.league,
+        event.date,
+        event.team_one.id,
+        event.team_two.id,
+    )
+
+
+@dataclass(slots=True)
+class ScoreUpdate:
+    """A parsed response: all events, or the changes since a cursor (delta)."""
+
+    events: list[Event]
+    cursor: str | None = None
+    delta: bool = False
+    deleted: list[object] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class StreamMessage:
+    """One Server-Sent Events message."""
+
+    event: str
+    data: str
+    id: str | None
+
+
+class SourceFeed:
+    """The current events of one source and its delta cursor."""
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.cursor: str | None = None
+        # event_key() -> event, in source order
+        self.events: dict[object, Event] = {}
+        # Set while a stream subscription keeps the events current
+        self.streaming = threading.Event()
+        self.subscribed = False
+        self.lock = threading.Lock()
+
+    def current(self) -> list[Event]:
+        """The events as of the last update."""
+        with self.lock:
+            return list(self.events.values())
+
+    def apply(self, update: ScoreUpdate) -> list[Event]:
+        """
+        Merge an update: a full one replaces the events, a delta adds, changes
+        and deletes some. Events already known are updated in place.
+
+        Args:
+            update: The parsed response or pushed message
+
+        Returns:
+            The events after the update
+        """
+        with self.lock:
+            if update.delta:
+                previous = events = self.events
+                for key in update.deleted:
+                    events.pop(key, None)
+            else:
+                previous, events = self.events, {}
+
+            for event in update.events:
+                key = event_key(event)
+                if not update.delta and key in events:
+                    # Listed twice in one response, the first one wins
+                    continue
+                known = previous.get(key)
+                if known is not None:
+                    known.update(event)
+                    event = known
+                events[key] = event
+
+            self.events = events
+            self.cursor = update.cursor
+            return list(events.values())
+
+
+_feeds: dict[str, SourceFeed] = {}
+_feeds_lock = threading.Lock()
+
+
+def feed_for(url: str) -> SourceFeed:
+    """The feed of a source URL (one per URL, created on first use)."""
+    with _feeds_lock:
+        feed = _feeds.get(url)
+        if feed is None:
+            feed = _feeds[url] = SourceFeed(url)
+        return feed
+
+
+def stream_url(url: str) -> str:
+    """The stream endpoint of a source: /stream appended to its path."""
+    parts = urlsplit(url)
+    return urlunsplit(parts._replace(path=parts.path.rstrip("/") + "/stream"))
+
+
+def iter_stream_messages(lines: Iterable[str]) -> Iterator[StreamMessage]:
+    """
+    Parse Server-Sent Events. Comments (keep-alives) and messages without
+    data are skipped.
+
+    Args:
+        lines: The decoded lines of the response, without line endings
+
+    Yields:
+        Each message, as soon as its blank line arrives
+    """
+    event = "message"
+    data: list[str] = []
+    message_id: str | None = None
+    for line in lines:
+        if not line:
+            if data:
+                yield StreamMessage(event, "\n".join(data), message_id)
+            event, data = "message", []
+            continue
+        if line.startswith(":"):
+            continue
+        name, _, value = line.partition(":")
+        value = value.removeprefix(" ")
+        if name == "event":
+            event = value
+        elif name == "data":
+            data.append(value)
+        elif name == "id":
+            message_id = value
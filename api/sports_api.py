@@ -1,112 +1,494 @@
 #!/usr/bin/env python3
 
 #  To test this code run `python3 -m api.sports_api` from the project root directory.
+import itertools
+import json
+import logging
+import threading
+import time
+import urllib.request
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime, timedelta
+from typing import Any
 
 import requests
 
-from config import API_URL, IMAGES_DIR
+import config
 from models import Event, SportsData, Team
-from utils import get_or_download_image
+from utils import fixtures, get_or_download_image, metrics, resilience
+from utils.profiling import profile_in_thread
+from utils.resilience import Backoff
 
+from . import score_feed
+from .json_stream import iter_array_items
+from .score_feed import ScoreUpdate, SourceFeed, StreamMessage, event_key
 
-def fetch_scores() -> SportsData | None:
+logger = logging.getLogger(__name__)
+
+# Size of the body chunks read when STREAM_PARSE is enabled (bytes)
+STREAM_CHUNK_SIZE = 16384
+# Seconds without a message or keep-alive before a score stream is reconnected
+STREAM_IDLE_TIMEOUT = 60
+# Sources fetched at the same time
+SOURCE_WORKERS = 8
+
+# Shared by every fetch. A source still being fetched from an earlier cycle is
+# waited on again rather than requested a second time
+_executor = ThreadPoolExecutor(
+    max_workers=SOURCE_WORKERS, thread_name_prefix="score-source"
+)
+_in_flight: dict[str, Future[list[Event] | None]] = {}
+# Cleared while the board sleeps: stream subscriptions close and wait
+_streams_active = threading.Event()
+_streams_active.set()
+
+
+def _parse_team(team_data: dict[str, Any]) -> Team:
+    """Build a Team from its API data (badge is downloaded separately)."""
+    return Team(
+        id=team_data.get("id", ""),
+        badge=team_data.get("badge", ""),
+        location=team_data.get("location", ""),
+        name=team_data.get("name", ""),
+        abbreviation=team_data.get("abbreviation", ""),
+        score=team_data.get("score", 0),
+    )
+
+
+def parse_event(event_data: dict[str, Any]) -> Event:
     """
-    Fetch sports scores from the API.
+    Build an Event from its API data.
+    Badge paths are left empty, see attach_badges().
+
+    Args:
+        event_data: A single item of the API "events" array
+
     Returns:
-        SportsData object containing events, or None if request fails.
+        The parsed Event
     """
-    if not API_URL:
-        print("Error: API_URL not configured in .env file")
+    return Event(
+        id=event_data.get("id", ""),
+        date=event_data.get("date", ""),
+        time=event_data.get("time", ""),
+        status=event_data.get("status", ""),
+        status_type=event_data.get("status_type", ""),
+        league=event_data.get("league", ""),
+        league_badge=event_data.get("league_badge", ""),
+        team_one=_parse_team(event_data.get("team_one", {})),
+        team_two=_parse_team(event_data.get("team_two", {})),
+    )
 
-        return None
 
-    try:
-        response = requests.get(API_URL, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        # Parse events from API response
-        events = []
-        for event_data in data.get("events", []):
-            # Parse team data
-            team_one_data = event_data.get("team_one", {})
-            team_two_data = event_data.get("team_two", {})
-
-            # Download team badges
-            team_one_badge_path = get_or_download_image(
-                team_one_data.get("badge", ""), IMAGES_DIR / "teams"
-            )
-            team_two_badge_path = get_or_download_image(
-                team_two_data.get("badge", ""), IMAGES_DIR / "teams"
-            )
+def in_display_window(event: Event) -> bool:
+    """
+    Check if the event is within one week before and two weeks after today.
 
-            team_one = Team(
-                id=team_one_data.get("id", ""),
-                badge=team_one_data.get("badge", ""),
-                location=team_one_data.get("location", ""),
-                name=team_one_data.get("name", ""),
-                abbreviation=team_one_data.get("abbreviation", ""),
-                score=team_one_data.get("score", 0),
-                badge_path=team_one_badge_path,
-            )
-            team_two = Team(
-                id=team_two_data.get("id", ""),
-                badge=team_two_data.get("badge", ""),
-                location=team_two_data.get("location", ""),
-                name=team_two_data.get("name", ""),
-                abbreviation=team_two_data.get("abbreviation", ""),
-                score=team_two_data.get("score", 0),
-                badge_path=team_two_badge_path,
-            )
+    Args:
+        event: The event to check
 
-            # Download league badge
-            league_badge_path = get_or_download_image(
-                event_data.get("league_badge", ""), IMAGES_DIR / "leagues"
-            )
+    Returns:
+        True if the event should be displayed
+    """
+    if event.date_obj is None:
+        # If date parsing fails, include the event anyway
+        return True
 
-            # Parse event data
-            event = Event(
-                id=event_data.get("id", ""),
-                date=event_data.get("date", ""),
-                time=event_data.get("time", ""),
-                status=event_data.get("status", ""),
-                status_type=event_data.get("status_type", ""),
-                league=event_data.get("league", ""),
-                league_badge=event_data.get("league_badge", ""),
-                team_one=team_one,
-                team_two=team_two,
-                league_badge_path=league_badge_path,
-            )
+    now = datetime.now()
+    window_start = now - timedelta(weeks=1)
+    window_end = now + timedelta(weeks=2)
+    return window_start <= event.date_obj <= window_end
+
+
+def attach_badges(event: Event) -> None:
+    """Download (or reuse cached) team and league badges for an event."""
+    event.team_one.badge_path = get_or_download_image(
+        event.team_one.badge, config.IMAGES_DIR / "teams"
+    )
+    event.team_two.badge_path = get_or_download_image(
+        event.team_two.badge, config.IMAGES_DIR / "teams"
+    )
+    event.league_badge_path = get_or_download_image(
+        event.league_badge, config.IMAGES_DIR / "leagues"
+    )
 
-            # Only include events within one week before today and one week after today
-            try:
-                event_date = datetime.strptime(event.date, "%b %d %Y")
-                now = datetime.now()
-                window_start = now - timedelta(weeks=1)
-                window_end = now + timedelta(weeks=2)
-                if event_date < window_start or event_date > window_end:
-                    continue
-            except ValueError:
-                # If date parsing fails, include the event anyway
-                pass
 
+def parse_events(data: dict[str, Any]) -> list[Event]:
+    """
+    Parse the API response into events within the display window.
+
+    Args:
+        data: The decoded API response
+
+    Returns:
+        List of events to display (badges not yet attached)
+    """
+    events = []
+    for event_data in data.get("events", []):
+        event = parse_event(event_data)
+        # Only include events within one week before today and two weeks after today
+        if in_display_window(event):
             events.append(event)
+    return events
+
+
+def parse_changes(data: dict[str, Any]) -> tuple[list[Event], list[object]]:
+    """
+    Parse a delta response. Changed events that left the display window are
+    deleted like the ones listed in "deleted".
+
+    Args:
+        data: The decoded delta response
+
+    Returns:
+        The changed events to display and the keys of the events to remove
+    """
+    events = []
+    deleted: list[object] = list(data.get("deleted", []))
+    for event_data in data.get("events", []):
+        event = parse_event(event_data)
+        if in_display_window(event):
+            events.append(event)
+        else:
+            deleted.append(event_key(event))
+    return events, deleted
+
+
+def iter_events(chunks: Iterable[bytes]) -> Iterator[Event]:
+    """
+    Lazily parse events from a chunked API response.
+    Events outside the display window are dropped before the next one is read.
+
+    Args:
+        chunks: The raw response body, e.g. response.iter_content()
+
+    Yields:
+        Each event to display (badges not yet attached)
+    """
+    for event_data in iter_array_items(chunks, "events"):
+        event = parse_event(event_data)
+        if in_display_window(event):
+            yield event
+
+
+def merge_events(results: list[list[Event]]) -> list[Event]:
+    """
+    Merge the events of several sources, dropping duplicates by Event.id.
+
+    Args:
+        results: The events of each source, highest precedence first
+
+    Returns:
+        The merged events, in the order they were first seen
+    """
+    merged: dict[object, Event] = {}
+    for events in results:
+        for event in events:
+            merged.setdefault(event_key(event), event)
+    return list(merged.values())
+
+
+@profile_in_thread
+def _fetch_source(url: str) -> list[Event] | None:
+    """
+    The events of a single source: as pushed by its stream while subscribed,
+    otherwise fetched (only the changes if the source supports deltas), unless
+    its host's circuit breaker is open.
+
+    Args:
+        url: The source URL
+
+    Returns:
+        List of events to display (badges of new events not yet attached), or
+        None if request fails.
+    """
+    feed = score_feed.feed_for(url)
+    if config.API_STREAM:
+        subscribe(feed)
+        if feed.streaming.is_set():
+            return feed.current()
+
+    breaker = resilience.breaker_for(url)
+    if not breaker.allow():
+        logger.warning("Skipping source, circuit open", extra={"url": url})
+        return None
+
+    update = _request_source(url, feed.cursor if config.DELTA_UPDATES else None)
+    if update is None:
+        breaker.record_failure()
+        return None
+    breaker.record_success()
+    metrics.SCORE_UPDATES.inc(kind="delta" if update.delta else "full")
+    return feed.apply(update)
+
+
+def _request_source(url: str, since: str | None = None) -> ScoreUpdate | None:
+    """
+    Fetch and parse the events of a single source.
 
-        return SportsData(events=events)
+    Args:
+        url: The source URL
+        since: Cursor of the last response, to get only the changes since
+
+    Returns:
+        All events to display or the changes (badges not yet attached), or None
+        if request fails.
+    """
+    params = {"since": since} if since else None
+    try:
+        with requests.get(
+            url,
+            params=params,
+            timeout=config.SOURCE_TIMEOUT,
+            stream=config.STREAM_PARSE,
+        ) as response:
+            if since and response.status_code == 410:
+                logger.info("Score cursor expired, fetching all", extra={"url": url})
+                return _request_source(url)
+            response.raise_for_status()
+            fixtures.record_response(url, response, "scores")
+            cursor = response.headers.get(score_feed.CURSOR_HEADER)
+
+            if response.headers.get(score_feed.DELTA_HEADER):
+                with metrics.PARSE_SECONDS.time():
+                    events, deleted = parse_changes(response.json())
+                return ScoreUpdate(events, cursor, delta=True, deleted=deleted)
+
+            if config.STREAM_PARSE:
+                # Read the body item by item so only displayed events are kept
+                chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+                # Parsing is interleaved with reading, so this includes the download
+                with metrics.PARSE_SECONDS.time():
+                    return ScoreUpdate(list(iter_events(chunks)), cursor)
+
+            with metrics.PARSE_SECONDS.time():
+                data = response.json()
+                # Parse events from API response
+                return ScoreUpdate(parse_events(data), cursor)
     except requests.Timeout:
-        print("Error: API request timed out")
+        logger.error("API request timed out", extra={"url": url})
         return None
 
     except requests.RequestException as e:
-        print(f"Error fetching scores from API: {e}")
+        logger.error("Error fetching scores from API", extra={"url": url, "error": e})
         return None
 
     except (KeyError, ValueError, TypeError) as e:
-        print(f"Error parsing API response data: {e}")
+        logger.error("Error parsing API response data", extra={"url": url, "error": e})
+        return None
+
+
+def subscribe(feed: SourceFeed) -> None:
+    """Start receiving pushed updates of a source, if not already."""
+    with feed.lock:
+        if feed.subscribed:
+            return
+        feed.subscribed = True
+    threading.Thread(
+        target=_stream_updates, args=(feed,), name="score-stream", daemon=True
+    ).start()
+
+
+def pause_streams() -> None:
+    """Close the stream subscriptions (sleep mode), resume_streams() reopens them."""
+    if _streams_active.is_set():
+        _streams_active.clear()
+        logger.info("Score streams paused")
+
+
+def resume_streams() -> None:
+    _streams_active.set()
+
+
+def _stream_updates(feed: SourceFeed) -> None:
+    """Keep a stream subscription open, the source is polled while it is down."""
+    retry = Backoff()
+    try:
+        while config.API_STREAM and feed.url in config.API_SOURCES:
+            _streams_active.wait()
+            try:
+                if _read_stream(feed):
+                    retry.reset()
+            except (OSError, KeyError, ValueError, TypeError) as e:
+                logger.warning(
+                    "Score stream down, polling", extra={"url": feed.url, "error": e}
+                )
+            except Exception:
+                # A push the parser did not expect, the source is polled meanwhile
+                logger.exception(
+                    "Score stream failed, polling", extra={"url": feed.url}
+                )
+            feed.streaming.clear()
+            if _streams_active.is_set():
+                time.sleep(retry.next_delay())
+    finally:
+        feed.streaming.clear()
+        with feed.lock:
+            feed.subscribed = False
+    logger.info("Score stream closed", extra={"url": feed.url})
+
+
+def _read_stream(feed: SourceFeed) -> bool:
+    """
+    Apply pushed updates until the stream ends.
+
+    Returns:
+        True if any update was received
+    """
+    headers = {"Accept": "text/event-stream"}
+    if feed.cursor and config.DELTA_UPDATES:
+        headers["Last-Event-ID"] = feed.cursor
+    request = urllib.request.Request(score_feed.stream_url(feed.url), headers=headers)
+    received = False
+    # Read with http.client rather than requests: it hands over each line as
+    # soon as it arrives, requests holds a message back until more bytes come
+    with urllib.request.urlopen(request, timeout=STREAM_IDLE_TIMEOUT) as response:
+        content_type = response.headers.get("Content-Type", "")
+        if not content_type.startswith("text/event-stream"):
+            raise ValueError(f"Not an event stream: {content_type}")
+
+        # Paused streams end at the next line, keep-alives included
+        lines = itertools.takewhile(
+            lambda _line: _streams_active.is_set(),
+            (line.decode().rstrip("\r\n") for line in response),
+        )
+        for message in score_feed.iter_stream_messages(lines):
+            update = _parse_message(message)
+            if update is None:
+                continue
+            for event in update.events:
+                attach_badges(event)
+            feed.apply(update)
+            metrics.SCORE_UPDATES.inc(kind="push")
+            if not received:
+                logger.info("Receiving pushed scores", extra={"url": feed.url})
+                received = True
+                feed.streaming.set()
+            if not (config.API_STREAM and feed.url in config.API_SOURCES):
+                # Turned off or removed by a settings reload
+                break
+    return received
+
+
+def _parse_message(message: StreamMessage) -> ScoreUpdate | None:
+    """
+    The update in a stream message ("scores" or "delta"), None for others.
+    Raises ValueError if the message is not a response object with event objects.
+    """
+    if message.event not in ("scores", "delta"):
+        return None
+    data = json.loads(message.data)
+    if not isinstance(data, dict) or not all(
+        isinstance(event_data, dict) for event_data in data.get("events", [])
+    ):
+        raise ValueError(f'Malformed "{message.event}" message')
+    if message.event == "scores":
+        return ScoreUpdate(parse_events(data), message.id)
+    events, deleted = parse_changes(data)
+    return ScoreUpdate(events, message.id, delta=True, deleted=deleted)
+
+
+def _submit(url: str) -> Future[list[Event] | None]:
+    """Fetch a source on the shared executor, unless it is still being fetched."""
+    future = _in_flight.get(url)
+    if future is None or future.done():
+        future = _in_flight[url] = _executor.submit(_fetch_source, url)
+    return future
+
+
+def _fetch_concurrently(sources: list[str]) -> list[Event] | None:
+    """
+    Fetch all sources in parallel and merge the ones that answer in time.
+    A source slower than SOURCE_TIMEOUT, or failing, is skipped for this cycle.
+
+    Args:
+        sources: The source URLs, in precedence order
+
+    Returns:
+        The merged events, or None if every source failed
+    """
+    futures = {_submit(url): url for url in sources}
+    # (url, events) in the order the sources answered
+    answered: list[tuple[str, list[Event]]] = []
+    try:
+        for future in as_completed(futures, timeout=config.SOURCE_TIMEOUT):
+            url = futures[future]
+            try:
+                events = future.result()
+            except Exception:
+                logger.exception("Unexpected error fetching source", extra={"url": url})
+                continue
+            if events is not None:
+                answered.append((url, events))
+    # Only the builtin TimeoutError from Python 3.11
+    except FuturesTimeoutError:
+        # Slow sources finish on their own timeout, they are not requested again
+        # until then
+        slow = [url for future, url in futures.items() if not future.done()]
+        logger.warning("Skipping slow sources", extra={"urls": ",".join(slow)})
+
+    if not answered:
+        return None
+    if len(answered) == 1:
+        return answered[0][1]
+
+    if config.SOURCE_PRECEDENCE != "fastest":
+        answered.sort(key=lambda result: sources.index(result[0]))
+    return merge_events([events for _url, events in answered])
+
+
+def fetch_scores() -> SportsData | None:
+    """
+    Fetch sports scores from the API.
+    When several sources are configured they are fetched concurrently and merged.
+    Returns:
+        SportsData object containing events, or None if request fails.
+    """
+    with metrics.FETCH_SECONDS.time():
+        data = _fetch_scores()
+    metrics.FETCH_TOTAL.inc(result="ok" if data else "error")
+    return data
+
+
+def _fetch_scores() -> SportsData | None:
+    sources = config.API_SOURCES
+    if not sources:
+        logger.error("API_URL not configured in .env file")
+
+        return None
+
+    # A single source goes through the pool too, for the same deadline
+    events = _fetch_concurrently(sources)
+
+    if events is None:
         return None
 
+    for event in events:
+        attach_badges(event)
+
+    return SportsData(events=events)
+
 
 if __name__ == "__main__":
+    import argparse
+    from pathlib import Path
+
+    from utils.logging_setup import setup_logging
+
+    parser = argparse.ArgumentParser(description="Test the API fetch")
+    parser.add_argument(
+        "--record",
+        type=Path,
+        metavar="BUNDLE",
+        help="Save the responses and badges to a fixture bundle (see utils.fixtures)",
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    if args.record:
+        fixtures.start_recording(args.record)
+
     # Test the API fetch
     print("Testing API fetch...")
     data = fetch_scores()
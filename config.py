@@ -1,56 +1,164 @@
 #!/usr/bin/env python3
 import os
 from pathlib import Path
+from typing import TypedDict
 
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
-
 # Base directory
 BASE_DIR = Path(__file__).parent.absolute()
 
+ENV_FILE = BASE_DIR / ".env"
+# The settings are read from _env: the variables in .env, unless already set in
+# the environment. A reload runs this file again with a new _env in place (see
+# utils.config_reload), so os.environ is only changed here, at startup
+if "_env" not in globals():
+    # The environment the service was started with
+    BASE_ENV = dict(os.environ)
+    # Load environment variables from .env file
+    load_dotenv(ENV_FILE)
+    _env = dict(os.environ)
+
 # API Configuration
-API_URL = os.getenv("API_URL")
+API_URL = _env.get("API_URL")
+# Several score feeds can be combined, e.g. one per league or a primary and a mirror.
+# API_URLS is a comma separated list and replaces API_URL when set.
+API_SOURCES = [
+    url.strip() for url in _env.get("API_URLS", API_URL or "").split(",") if url.strip()
+]
+# Seconds to wait for each source before skipping it for this cycle
+SOURCE_TIMEOUT = int(_env.get("SOURCE_TIMEOUT", 10))
+# Which source wins when several have the same event:
+# "order" (first in API_URLS) or "fastest" (first to answer)
+SOURCE_PRECEDENCE = _env.get("SOURCE_PRECEDENCE", "order").lower()
+# Parse the "events" array item by item instead of loading the whole response
+STREAM_PARSE = _env.get("STREAM_PARSE", "false").lower() == "true"
+# Sources that send an X-Scores-Cursor header are asked for the changes since
+# their last response only (see api.score_feed)
+DELTA_UPDATES = _env.get("DELTA_UPDATES", "true").lower() == "true"
+# Subscribe to <source>/stream (Server-Sent Events) for score changes as they
+# happen. A source is polled as usual whenever its stream is down
+API_STREAM = _env.get("API_STREAM", "false").lower() == "true"
+
+# Display Mode: "console", "matrix" or "memory" (headless, draws into an image)
+DISPLAY_MODE = _env.get("DISPLAY_MODE", "console").lower()
+# Color pipeline applied to badges and text: gamma exponent, red/green/blue
+# multipliers and badge brightness (percent, on top of DISPLAY_BRIGHTNESS)
+DISPLAY_GAMMA = float(_env.get("DISPLAY_GAMMA", 1.0))
+_balance = [
+    float(value) for value in _env.get("COLOR_BALANCE", "1.0,1.0,1.0").split(",")
+]
+if len(_balance) != 3:
+    raise ValueError("COLOR_BALANCE must be three multipliers")
+COLOR_BALANCE = (_balance[0], _balance[1], _balance[2])
+SPRITE_BRIGHTNESS = int(_env.get("SPRITE_BRIGHTNESS", 100))
+
+# Runtime: "sync" (one blocking loop) or "async" (asyncio tasks, requires aiohttp)
+RUNTIME_MODE = _env.get("RUNTIME_MODE", "sync").lower()
+# The interval between score fetches when running the async runtime (seconds)
+FETCH_INTERVAL = int(_env.get("FETCH_INTERVAL", 60))
 
-# Display Mode: "console" or "matrix"
-DISPLAY_MODE = os.getenv("DISPLAY_MODE", "console").lower()
+# Hub Mode: "off", "hub" (poll the API and serve peer boards) or "client"
+# (receive scores from a hub at HUB_URL instead of polling the API)
+HUB_MODE = _env.get("HUB_MODE", "off").lower()
+HUB_PORT = int(_env.get("HUB_PORT", 8750))
+# Address the hub listens on: empty for the board's LAN address, or e.g.
+# 0.0.0.0 for every interface
+HUB_BIND = _env.get("HUB_BIND", "")
+HUB_URL = _env.get("HUB_URL", "")
 
 # Display Settings
 # The number of seconds to display league info and each event (seconds)
-LEAGUE_DISPLAY_TIME = int(os.getenv("LEAGUE_DISPLAY_TIME", 60))
-EVENT_DISPLAY_TIME = int(os.getenv("EVENT_DISPLAY_TIME", 60))
-# The interval to wait before retrying a failed API request (seconds)
-TRY_AGAIN_INTERVAL = int(os.getenv("TRY_AGAIN_INTERVAL", 120))
+LEAGUE_DISPLAY_TIME = int(_env.get("LEAGUE_DISPLAY_TIME", 60))
+EVENT_DISPLAY_TIME = int(_env.get("EVENT_DISPLAY_TIME", 60))
+# Longest display rotation before scores are fetched again (seconds, 0 for no
+# limit). Longer rotations are shortened down to MIN_SCREEN_TIME per screen,
+# then the least important games are left out (live games are kept longest)
+CYCLE_BUDGET = int(_env.get("CYCLE_BUDGET", 600))
+MIN_SCREEN_TIME = int(_env.get("MIN_SCREEN_TIME", 10))
+# Retries of a failed API request back off exponentially, with jitter, from
+# RETRY_BASE_DELAY up to TRY_AGAIN_INTERVAL (seconds)
+RETRY_BASE_DELAY = int(_env.get("RETRY_BASE_DELAY", 15))
+TRY_AGAIN_INTERVAL = int(_env.get("TRY_AGAIN_INTERVAL", 120))
+# Consecutive failures before requests to a host are paused, and the first pause
+BREAKER_FAILURES = int(_env.get("BREAKER_FAILURES", 3))
+BREAKER_COOLDOWN = int(_env.get("BREAKER_COOLDOWN", 30))
+# How long a badge URL answering 404/410 is not requested again (seconds)
+BADGE_NEGATIVE_TTL = int(_env.get("BADGE_NEGATIVE_TTL", 86400))
+# Longest a badge download may take, redirects and body included (seconds)
+BADGE_TIMEOUT = int(_env.get("BADGE_TIMEOUT", 10))
 # Sleep Schedule (PDT/PST - automatically handles daylight savings)
-TIMEZONE = os.getenv("TIMEZONE", "America/Los_Angeles")
-SLEEP_START_TIME = os.getenv("SLEEP_START_TIME", "23:00")
-SLEEP_END_TIME = os.getenv("SLEEP_END_TIME", "07:00")
-
-# Matrix Configuration
-MATRIX_CONFIG = {
-    "brightness": 70,
-    "rows": 32,
-    "cols": 64,
-    "chain_length": 1,
-    "parallel": 1,
-    "hardware_mapping": "adafruit-hat-pwm",
-    "gpio_slowdown": 2,
-}
+TIMEZONE = _env.get("TIMEZONE", "America/Los_Angeles")
+SLEEP_START_TIME = _env.get("SLEEP_START_TIME", "23:00")
+SLEEP_END_TIME = _env.get("SLEEP_END_TIME", "07:00")
+# Fetch the scores this long before waking up, so the board wakes with fresh
+# data (seconds)
+PREFETCH_BEFORE_WAKE = int(_env.get("PREFETCH_BEFORE_WAKE", 300))
 
 # Paths
 ASSETS_DIR = BASE_DIR / "assets"
 FONTS_DIR = ASSETS_DIR / "fonts"
 IMAGES_DIR = ASSETS_DIR / "images"
 DEFAULT_FONT = FONTS_DIR / "5x7.bdf"  # Smaller font for more compact display
+# Resized, color corrected badges are packed into one memory-mapped file in
+# ATLAS_DIR, shared by restarts and processes. It starts over past ATLAS_MAX_MB
+SPRITE_ATLAS = _env.get("SPRITE_ATLAS", "true").lower() == "true"
+ATLAS_DIR = Path(_env.get("ATLAS_DIR", IMAGES_DIR / "atlas"))
+ATLAS_MAX_MB = int(_env.get("ATLAS_MAX_MB", 16))
+# The last fetched scores, shown as the boot frame on the next start
+SNAPSHOT_FILE = Path(_env.get("SNAPSHOT_FILE", BASE_DIR / "snapshot.json"))
+
+# Settings are reloaded on SIGHUP, and when .env changes: it is checked every
+# CONFIG_WATCH_INTERVAL seconds (0 to reload on SIGHUP only)
+CONFIG_WATCH_INTERVAL = int(_env.get("CONFIG_WATCH_INTERVAL", 5))
+
+# Stall watchdog: the board counts as stalled when a frame is FRAME_SLO seconds
+# later than the screen hold it follows, or no fetch succeeded for FETCH_SLO
+# seconds (0 to not check). systemd heartbeats stop while stalled
+FRAME_SLO = int(_env.get("FRAME_SLO", 120))
+FETCH_SLO = int(_env.get("FETCH_SLO", 1800))
+
+# Logging: level (DEBUG, INFO, WARNING, ERROR) and format ("text" or "json")
+LOG_LEVEL = _env.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = _env.get("LOG_FORMAT", "text").lower()
+
+# Metrics: counters and histograms for fetches, badge cache, renders and sleep checks
+METRICS_ENABLED = _env.get("METRICS_ENABLED", "false").lower() == "true"
+# Prometheus text file rewritten every METRICS_INTERVAL seconds (empty to disable)
+METRICS_FILE = _env.get("METRICS_FILE", "")
+METRICS_INTERVAL = int(_env.get("METRICS_INTERVAL", 15))
+# Port for a local http://<board>:<port>/metrics endpoint (0 to disable)
+METRICS_PORT = int(_env.get("METRICS_PORT", 0))
+
+# Profiling: run this many fetch/render cycles back to back, write cProfile
+# stats and sampled stacks, then exit (0 = off)
+PROFILE_CYCLES = int(_env.get("PROFILE_CYCLES", 0))
+PROFILE_DIR = Path(_env.get("PROFILE_DIR", BASE_DIR / "profile"))
+# Milliseconds between stack samples
+PROFILE_SAMPLE_INTERVAL = int(_env.get("PROFILE_SAMPLE_INTERVAL", 5))
+# Run the cycles a second time with tracemalloc, for the memory snapshots
+PROFILE_MEMORY = _env.get("PROFILE_MEMORY", "true").lower() == "true"
+
+
+class MatrixConfig(TypedDict):
+    brightness: int
+    rows: int
+    cols: int
+    chain_length: int
+    parallel: int
+    hardware_mapping: str
+    gpio_slowdown: int
+
 
 # Matrix Configuration
-MATRIX_CONFIG = {
-    "brightness": int(os.getenv("DISPLAY_BRIGHTNESS", 70)),
-    "rows": int(os.getenv("MATRIX_ROWS", 32)),
-    "cols": int(os.getenv("MATRIX_COLS", 64)),
-    "chain_length": int(os.getenv("MATRIX_CHAIN_LENGTH", 1)),
-    "parallel": int(os.getenv("MATRIX_PARALLEL", 1)),
-    "hardware_mapping": os.getenv("MATRIX_HARDWARE_MAPPING", "adafruit-hat-pwm"),
-    "gpio_slowdown": int(os.getenv("MATRIX_GPIO_SLOWDOWN", 2)),
+# Panel brightness (percent), applied to the running display on reload
+DISPLAY_BRIGHTNESS = int(_env.get("DISPLAY_BRIGHTNESS", 70))
+MATRIX_CONFIG: MatrixConfig = {
+    "brightness": DISPLAY_BRIGHTNESS,
+    "rows": int(_env.get("MATRIX_ROWS", 32)),
+    "cols": int(_env.get("MATRIX_COLS", 64)),
+    "chain_length": int(_env.get("MATRIX_CHAIN_LENGTH", 1)),
+    "parallel": int(_env.get("MATRIX_PARALLEL", 1)),
+    "hardware_mapping": _env.get("MATRIX_HARDWARE_MAPPING", "adafruit-hat-pwm"),
+    "gpio_slowdown": int(_env.get("MATRIX_GPIO_SLOWDOWN", 2)),
 }
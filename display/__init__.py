@@ -1,6 +1,19 @@
 #!/usr/bin/env python3
 """Display package for rendering sports scores."""
 
-from .matrix_display import display_scores
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .matrix_display import display_scores
 
 __all__ = ["display_scores"]
+
+
+def __getattr__(name: str) -> Any:
+    # Imported on first use, so the boot frame does not wait for the planner
+    if name != "display_scores":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = importlib.import_module(".matrix_display", __name__).display_scores
+    globals()[name] = value
+    return value
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Display backends: where draw lists from display.layout end up.
+
+    matrix   the RGB LED matrix (requires rgbmatrix, on the Pi)
+    console  prints each frame as text, for testing
+    memory   draws into an in-memory image (headless runs and profiling)
+"""
+
+import gc
+import logging
+from abc import ABC, abstractmethod
+
+from PIL import Image, ImageDraw, ImageFont
+
+import config
+from utils import config_reload, metrics, watchdog
+
+from .layout import DrawList, ImageOp
+
+logger = logging.getLogger(__name__)
+
+
+def display_size() -> tuple[int, int]:
+    """Width and height of the configured panel (pixels)."""
+    width = config.MATRIX_CONFIG["cols"] * config.MATRIX_CONFIG["chain_length"]
+    height = config.MATRIX_CONFIG["rows"] * config.MATRIX_CONFIG["parallel"]
+    return width, height
+
+
+class DisplayBackend(ABC):
+    """A display target. Subclasses implement the drawing primitives."""
+
+    width: int
+    height: int
+    # The draw list shown last
+    last_frame: DrawList = ()
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Clear the frame being drawn."""
+
+    @abstractmethod
+    def blit_image(self, image: Image.Image, x: int, y: int) -> None:
+        """Draw an RGB image with its top left corner at (x, y)."""
+
+    @abstractmethod
+    def draw_text(self, text: str, x: int, y: int, color: tuple[int, int, int]) -> None:
+        """Draw text with its baseline starting at (x, y)."""
+
+    @abstractmethod
+    def swap(self) -> None:
+        """Show the frame that was drawn."""
+
+    @abstractmethod
+    def set_brightness(self, brightness: int) -> None:
+        """Set the display brightness (percent)."""
+
+    def close(self) -> None:  # noqa: B027
+        """Blank the display."""
+
+    def describe(self, lines: list[str]) -> None:  # noqa: B027
+        """What the next frame shows, in words (used by the console backend)."""
+
+    def show(self, draw_list: DrawList) -> None:
+        """Draw a layout as the next frame and show it."""
+        self.clear()
+        for op in draw_list:
+            if isinstance(op, ImageOp):
+                self.blit_image(op.image, op.x, op.y)
+            else:
+                self.draw_text(op.text, op.x, op.y, op.color)
+        with metrics.SWAP_SECONDS.time():
+            self.swap()
+        self.last_frame = draw_list
+        watchdog.frame_shown()
+
+    def redraw(self) -> None:
+        """Draw the last frame again, e.g. after a brightness change."""
+        if self.last_frame:
+            self.show(self.last_frame)
+
+
+class MatrixBackend(DisplayBackend):
+    """Draws on the RGB matrix through a double-buffered frame canvas."""
+
+    def __init__(self) -> None:
+        # Imported here, the other backends run without rgbmatrix installed
+        from rgbmatrix import graphics
+
+        from utils.matrix_utils import initialize_matrix
+
+        self.graphics = graphics
+        self.matrix, self.font = initialize_matrix()
+        self.canvas = self.matrix.CreateFrameCanvas()
+        self.width = self.canvas.width
+        self.height = self.canvas.height
+        self.colors: dict[tuple[int, int, int], object] = {}
+
+    def clear(self) -> None:
+        self.canvas.Clear()
+
+    def blit_image(self, image: Image.Image, x: int, y: int) -> None:
+        self.canvas.SetImage(image, x, y)
+
+    def draw_text(self, text: str, x: int, y: int, color: tuple[int, int, int]) -> None:
+        matrix_color = self.colors.get(color)
+        if matrix_color is None:
+            matrix_color = self.colors[color] = self.graphics.Color(*color)
+        self.graphics.DrawText(self.canvas, self.font, x, y, matrix_color, text)
+
+    def swap(self) -> None:
+        self.canvas = self.matrix.SwapOnVSync(self.canvas)
+
+    def set_brightness(self, brightness: int) -> None:
+        # Applied as pixels are drawn, the next frame has the new brightness
+        self.matrix.brightness = brightness
+
+    def close(self) -> None:
+        self.matrix.Clear()
+
+
+class ConsoleBackend(DisplayBackend):
+    """
+    Prints what each frame shows: teams, score, status and date of a game, or
+    the league. Frames without a description print their text and images.
+    """
+
+    def __init__(self) -> None:
+        self.width, self.height = display_size()
+        self.images: list[tuple[int, int, Image.Image]] = []
+        self.texts: list[tuple[int, int, str]] = []
+        self.summary: list[str] = []
+
+    def clear(self) -> None:
+        self.images.clear()
+        self.texts.clear()
+
+    def describe(self, lines: list[str]) -> None:
+        self.summary = lines
+
+    def blit_image(self, image: Image.Image, x: int, y: int) -> None:
+        self.images.append((x, y, image))
+
+    def draw_text(self, text: str, x: int, y: int, color: tuple[int, int, int]) -> None:
+        self.texts.append((y, x, text))
+
+    def swap(self) -> None:
+        print("\n" + "-" * 60)
+        if self.summary:
+            print("\n".join(self.summary))
+            print("-" * 60)
+            self.summary = []
+            return
+        for x, y, image in self.images:
+            print(f"[image {image.width}x{image.height} at {x},{y}]")
+        # Text drawn on the same baseline makes up one line
+        lines: dict[int, list[str]] = {}
+        for y, _x, text in sorted(self.texts):
+            lines.setdefault(y, []).append(text)
+        for parts in lines.values():
+            print("".join(parts).strip())
+        print("-" * 60)
+
+    def set_brightness(self, brightness: int) -> None:
+        logger.info("Brightness set", extra={"brightness": brightness})
+
+
+class MemoryBackend(DisplayBackend):
+    """Draws into an RGB image, the last frame shown is kept in `frame`."""
+
+    def __init__(self) -> None:
+        self.width, self.height = display_size()
+        self.brightness = config.DISPLAY_BRIGHTNESS
+        self.buffer = Image.new("RGB", (self.width, self.height))
+        self.draw = ImageDraw.Draw(self.buffer)
+        self.font = ImageFont.load_default()
+        self.frame = self.buffer.copy()
+        self.frames_shown = 0
+
+    def clear(self) -> None:
+        self.buffer.paste((0, 0, 0), (0, 0, self.width, self.height))
+
+    def blit_image(self, image: Image.Image, x: int, y: int) -> None:
+        self.buffer.paste(image, (x, y))
+
+    def draw_text(self, text: str, x: int, y: int, color: tuple[int, int, int]) -> None:
+        self.draw.text((x, y), text, fill=color, font=self.font, anchor="ls")
+
+    def swap(self) -> None:
+        self.frame = self.buffer.copy()
+        self.frames_shown += 1
+
+    def set_brightness(self, brightness: int) -> None:
+        self.brightness = brightness
+
+    def close(self) -> None:
+        self.frame = Image.new("RGB", (self.width, self.height))
+
+
+BACKENDS: dict[str, type[DisplayBackend]] = {
+    "matrix": MatrixBackend,
+    "console": ConsoleBackend,
+    "memory": MemoryBackend,
+}
+
+
+def create_backend() -> DisplayBackend:
+    """Create the backend selected by DISPLAY_MODE."""
+    backend = BACKENDS.get(config.DISPLAY_MODE)
+    if backend is None:
+        logger.warning(
+            "Unknown DISPLAY_MODE, using console", extra={"mode": config.DISPLAY_MODE}
+        )
+        backend = ConsoleBackend
+    return backend()
+
+
+# The backend shared by the rotation and the sleep messages, and the panel
+# settings it was created with
+_backend: DisplayBackend | None = None
+_backend_settings: tuple[str, dict[str, object]] | None = None
+
+
+def _panel_settings() -> tuple[str, dict[str, object]]:
+    """DISPLAY_MODE and the matrix settings other than brightness."""
+    matrix = {
+        key: value for key, value in config.MATRIX_CONFIG.items() if key != "brightness"
+    }
+    return config.DISPLAY_MODE, matrix
+
+
+def get_backend() -> DisplayBackend:
+    """The shared display backend, created on first use (or after a release)."""
+    global _backend, _backend_settings
+    if _backend is None:
+        _backend = create_backend()
+        _backend_settings = _panel_settings()
+    return _backend
+
+
+def release_backend() -> None:
+    """
+    Blank the display and drop the shared backend. For the matrix this frees
+    the driver, whose refresh thread otherwise keeps a CPU core busy
+    repainting a black frame.
+    """
+    global _backend
+    if _backend is None:
+        return
+    _backend.close()
+    _backend = None
+    gc.collect()
+    logger.info("Display released")
+
+
+def _apply_display_settings(_changed: set[str]) -> None:
+    """
+    A brightness change is applied to the running display. A new panel
+    geometry or DISPLAY_MODE needs a new backend, created on the next frame.
+    """
+    if _backend is None:
+        # Released (sleeping) or not created yet, the next one uses the settings
+        return
+    if _panel_settings() != _backend_settings:
+        release_backend()
+        return
+    _backend.set_brightness(config.DISPLAY_BRIGHTNESS)
+    _backend.redraw()
+
+
+config_reload.on_reload(
+    {"DISPLAY_MODE", "DISPLAY_BRIGHTNESS", "MATRIX_CONFIG"}, _apply_display_settings
+)
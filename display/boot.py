@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""The first frame shown at startup, before any scores are fetched."""
+
+import logging
+
+from utils.snapshot import load_snapshot
+
+from .backends import get_backend
+from .layout import event_layout, message_layout
+
+logger = logging.getLogger(__name__)
+
+
+def show_boot_frame() -> None:
+    """
+    Show a game from the last snapshot (a live one if there is one), or a
+    loading message when there is no snapshot yet.
+    """
+    data = load_snapshot()
+    backend = get_backend()
+    if not data or not data.events:
+        backend.show(message_layout(None, ("Loading",), backend.width, backend.height))
+        return
+
+    event = next((event for event in data.events if event.is_in_progress), None)
+    backend.show(event_layout(event or data.events[0], backend.width))
+    logger.info("Boot frame from snapshot", extra={"events": len(data.events)})
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Screen layouts as draw lists, independent of the display backend.
+
+A draw list is a tuple of ImageOp/TextOp in drawing order. Layouts depend only
+on what is shown, so they are cached and replayed on any backend.
+"""
+
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image
+
+from models import Event
+from utils import calculate_centered_x, config_reload
+from utils.color import COLOR_SETTINGS, correct_color, correct_image
+from utils.sprite_atlas import get_sprite, put_sprite
+
+logger = logging.getLogger(__name__)
+
+# Text colors, put through the panel color pipeline when a layout is built
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+
+# Number of resized badges kept in memory
+SPRITE_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True, slots=True)
+class ImageOp:
+    """Draw an image with its top left corner at (x, y)."""
+
+    image: Image.Image
+    x: int
+    y: int
+    source: Path
+
+
+@dataclass(frozen=True, slots=True)
+class TextOp:
+    """Draw text with its baseline starting at (x, y)."""
+
+    text: str
+    x: int
+    y: int
+    color: tuple[int, int, int]
+
+
+DrawList = tuple[ImageOp | TextOp, ...]
+
+# (path, max size) -> resized RGB image, oldest first
+_sprites: dict[tuple[Path, int], Image.Image] = {}
+
+
+def load_sprite(path: Path | None, max_size: int) -> Image.Image | None:
+    """
+    Load an image resized to fit in a max_size square, keeping its aspect ratio,
+    and color corrected for the panel.
+    Sprites are cached in memory and in the sprite atlas, badge files never
+    change once downloaded.
+
+    Args:
+        path: The image file
+        max_size: Maximum width and height (pixels)
+
+    Returns:
+        The RGB image, or None if there is no such file
+    """
+    if path is None:
+        return None
+
+    key = (path, max_size)
+    sprite = _sprites.get(key)
+    if sprite is not None:
+        return sprite
+
+    sprite = get_sprite(path, max_size)
+    if sprite is None:
+        sprite = _decode_sprite(path, max_size)
+        if sprite is None:
+            return None
+        put_sprite(path, max_size, sprite)
+
+    if len(_sprites) >= SPRITE_CACHE_SIZE:
+        del _sprites[next(iter(_sprites))]
+    _sprites[key] = sprite
+    return sprite
+
+
+def _decode_sprite(path: Path, max_size: int) -> Image.Image | None:
+    """Decode, resize and color correct an image file."""
+    if not path.exists():
+        return None
+
+    image: Image.Image
+    try:
+        with Image.open(path) as image:
+            image = image.convert("RGB")
+    except OSError as e:
+        logger.warning("Error loading image", extra={"path": path, "error": e})
+        return None
+
+    aspect_ratio = image.width / image.height
+    if aspect_ratio > 1:  # Wider than tall
+        new_width = max_size
+        new_height = int(max_size / aspect_ratio)
+    else:  # Taller than wide
+        new_height = max_size
+        new_width = int(max_size * aspect_ratio)
+    sprite = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    return correct_image(sprite)
+
+
+def _icon_with_text(
+    icon_path: Path | None, lines: tuple[str, ...], width: int, height: int
+) -> DrawList:
+    """An icon on the left with lines of text right of it, vertically centered."""
+    ops: list[ImageOp | TextOp] = []
+
+    # Resize image to fit on left side (max 28x28 to leave room for text)
+    icon = load_sprite(icon_path, min(28, height - 4))
+    if icon is not None and icon_path is not None:
+        x_pos = 2
+        y_pos = (height - icon.height) // 2
+        ops.append(ImageOp(icon, x_pos, y_pos, icon_path))
+        # Text starts right of the image, with 4 pixels padding
+        text_x = x_pos + icon.width + 4
+    elif len(lines) == 1:
+        # No image, display text in center
+        text_x = (width - len(lines[0]) * 6) // 2
+    else:
+        text_x = 2
+
+    white = correct_color(WHITE)
+    if len(lines) == 1:
+        ops.append(TextOp(lines[0], text_x, height // 2 + 4, white))
+    else:
+        # Font height is 7 pixels, with some spacing between lines
+        line_height = 8
+        text_y = (height - line_height * len(lines)) // 2 + 7  # +7 for baseline
+        for line in lines:
+            ops.append(TextOp(line, text_x, text_y, white))
+            text_y += line_height
+    return tuple(ops)
+
+
+@lru_cache(maxsize=64)
+def league_layout(
+    league_name: str, badge_path: Path | None, width: int, height: int
+) -> DrawList:
+    """League badge on the left and name on the right, vertically centered."""
+    return _icon_with_text(badge_path, (league_name,), width, height)
+
+
+@lru_cache(maxsize=8)
+def message_layout(
+    icon_path: Path | None, lines: tuple[str, ...], width: int, height: int
+) -> DrawList:
+    """A message (sleep/wake, boot): icon on the left, one or more lines of text."""
+    return _icon_with_text(icon_path, lines, width, height)
+
+
+def _badge_pair(
+    badge_one: Path | None, badge_two: Path | None, size: int, width: int
+) -> tuple[list[ImageOp], list[int]]:
+    """Team badges on the left and right edges, with their heights."""
+    ops = []
+    heights = []
+    image1 = load_sprite(badge_one, size)
+    if image1 is not None and badge_one is not None:
+        ops.append(ImageOp(image1, 2, 0, badge_one))
+        heights.append(image1.height)
+    image2 = load_sprite(badge_two, size)
+    if image2 is not None and badge_two is not None:
+        ops.append(ImageOp(image2, width - image2.width - 2, 0, badge_two))
+        heights.append(image2.height)
+    return ops, heights
+
+
+@lru_cache(maxsize=256)
+def badges_layout(
+    badge_one: Path | None, badge_two: Path | None, width: int, height: int
+) -> DrawList:
+    """Team badges only, larger, one on the left and one on the right."""
+    ops, heights = _badge_pair(badge_one, badge_two, 28, width)
+    # Center each badge vertically
+    return tuple(
+        ImageOp(op.image, op.x, (height - badge_height) // 2, op.source)
+        for op, badge_height in zip(ops, heights, strict=True)
+    )
+
+
+@lru_cache(maxsize=256)
+def game_layout(
+    badge_one: Path | None,
+    badge_two: Path | None,
+    scores: tuple[str, str] | None,
+    info_text: str,
+    last_line_text: str,
+    width: int,
+) -> DrawList:
+    """
+    Game info: small team badges on the top row, then the score (or the date
+    of a scheduled game) and a status line.
+
+    Args:
+        badge_one: Team one badge
+        badge_two: Team two badge
+        scores: The two scores, or None for a scheduled game
+        info_text: Date shown instead of the scores
+        last_line_text: Status, winner or kick-off time
+        width: Display width
+
+    Returns:
+        The draw list
+    """
+    white = correct_color(WHITE)
+    green = correct_color(GREEN)
+    ops: list[ImageOp | TextOp] = []
+    badges, _heights = _badge_pair(badge_one, badge_two, 16, width)
+    ops.extend(ImageOp(op.image, op.x, 1, op.source) for op in badges)
+
+    # Scores or date on the second line (centered)
+    y_text = 24
+    if scores is None:
+        info_x = calculate_centered_x(info_text, width)
+        ops.append(TextOp(info_text, info_x, y_text, white))
+    else:
+        score1_text, score2_text = scores
+        # Center the entire score text
+        char_width = 5
+        start_x = calculate_centered_x(f"{score1_text} - {score2_text}", width)
+        dash_x = start_x + len(score1_text) * char_width
+        score2_x = dash_x + 3 * char_width  # " - " is 3 characters
+        ops.append(TextOp(score1_text, start_x, y_text, green))
+        ops.append(TextOp(" - ", dash_x, y_text, white))
+        ops.append(TextOp(score2_text, score2_x, y_text, green))
+
+    # Status on the third line, centered
+    last_line_x = calculate_centered_x(last_line_text, width)
+    ops.append(TextOp(last_line_text, last_line_x, 31, white))
+    return tuple(ops)
+
+
+def event_layout(event: Event, width: int) -> DrawList:
+    """The game_layout() of an event."""
+    if event.is_scheduled:
+        # Date and time for scheduled games
+        return game_layout(
+            event.team_one.badge_path,
+            event.team_two.badge_path,
+            None,
+            event.formatted_date,
+            event.time,
+            width,
+        )
+    # Scores for live/completed games (status truncated if too long)
+    return game_layout(
+        event.team_one.badge_path,
+        event.team_two.badge_path,
+        (str(event.team_one.score), str(event.team_two.score)),
+        "",
+        event.winner_text if event.is_final else event.status[:10],
+        width,
+    )
+
+
+def clear_caches(_changed: set[str] | None = None) -> None:
+    """Drop the sprites and layouts, e.g. after the color settings changed."""
+    _sprites.clear()
+    for layout in (league_layout, message_layout, badges_layout, game_layout):
+        layout.cache_clear()
+
+
+config_reload.on_reload(COLOR_SETTINGS, clear_caches)
@@ -1,332 +1,249 @@
 #!/usr/bin/env python3
 """Display module for showing sports scores."""
 
-import contextlib
-import time  # noqa: I001
+import logging
 from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
 from pathlib import Path
 
-from PIL import Image
+import config
+from models import Event, SportsData
+from utils import config_reload, is_sleep_time, metrics, watchdog
 
-with contextlib.suppress(ImportError):
-    from rgbmatrix import graphics
+from .backends import DisplayBackend, get_backend
+from .layout import DrawList, badges_layout, event_layout, league_layout
+from .planner import Slot, fit_to_budget
 
-from config import DISPLAY_MODE, EVENT_DISPLAY_TIME, LEAGUE_DISPLAY_TIME
-from models import SportsData
-from utils import calculate_centered_x, initialize_matrix, is_sleep_time
+logger = logging.getLogger(__name__)
 
+# The number of seconds the team badges are shown before each game screen
+BADGES_DISPLAY_TIME = 5
 
-def display_scores(data: SportsData) -> None:
-    """
-    Display sports scores organized by league.
-    Shows league info first, then iterates through each game.
 
-    Uses DISPLAY_MODE from config to determine console or matrix output.
+@dataclass
+class Screen:
+    """A single screen of the display rotation and how long to hold it."""
+
+    kind: str  # "league", "badges" or "game"
+    hold: float
+    league: str
+    badge_path: Path | None = None
+    event: Event | None = None
 
-    Args:
-        data: SportsData object containing events to display
-    """
-    if not data or not data.events:
-        print("No events to display")
-        return
 
-    # Group events by league
+def _group_by_league(data: SportsData) -> dict[str, list[Event]]:
+    """Group events by league, keeping API order."""
     leagues = defaultdict(list)
     for event in data.events:
         leagues[event.league].append(event)
+    return leagues
 
-    # Determine which display method to use
-    if DISPLAY_MODE == "matrix":
-        _display_on_matrix(leagues)
-    else:
-        _display_on_console(leagues)
 
+def build_rotation(data: SportsData) -> list[Screen]:
+    """
+    Build the ordered list of screens for one pass over the scores.
+    Shows league info first, then each game of that league, fitted into
+    CYCLE_BUDGET (see display.planner).
+
+    Args:
+        data: SportsData object containing events to display
 
-def _display_on_console(leagues: defaultdict) -> None:
-    """Display scores to console for testing."""
-    # Iterate through each league
-    for league_name, events in leagues.items():
+    Returns:
+        The screens to show, in order
+    """
+    slots = []
+    league_badges = {}
+    for league_name, events in _group_by_league(data).items():
         # Skip if no events in this league
         if not events:
             continue
 
-        # Display league header
-        league_badge_path = events[0].league_badge_path if events else None
-        print("\n" + "=" * 60)
-        print(f"LEAGUE: {league_name}")
-        if league_badge_path:
-            print(f"Badge: {league_badge_path}")
-        print("=" * 60)
-
-        # Wait on first display of league
-        print("Displaying league info...")
-        time.sleep(LEAGUE_DISPLAY_TIME)
-
-        # Display each game in this league
+        league_badges[league_name] = events[0].league_badge_path
+        slots.append(
+            Slot(
+                league_name,
+                None,
+                config.LEAGUE_DISPLAY_TIME,
+                min(config.MIN_SCREEN_TIME, config.LEAGUE_DISPLAY_TIME),
+            )
+        )
         for event in events:
-            # Check if sleep time has been reached
-            if is_sleep_time():
-                print("\nSleep time reached, stopping display...")
-                return
-
-            print("\n" + "-" * 60)
-            print(f"{event.team_one.full_name} vs {event.team_two.full_name}")
-            print(f"Status: {event.status}")
-            print(f"Score: {event.team_one.score} - {event.team_two.score}")
-            print(f"Date/Time: {event.date} at {event.time}")
-
-            if event.team_one.badge_path:
-                print(f"Team 1 Badge: {event.team_one.badge_path}")
-            if event.team_two.badge_path:
-                print(f"Team 2 Badge: {event.team_two.badge_path}")
-
-            print("-" * 60)
-
-            # Wait for each game
-            print("Displaying game...")
-            time.sleep(EVENT_DISPLAY_TIME)
-
-
-def _display_on_matrix(leagues: defaultdict) -> None:
-    """Display scores on RGB matrix."""
-    matrix, font = initialize_matrix()
-    canvas = matrix.CreateFrameCanvas()
-
-    try:
-        # Iterate through each league
-        for league_name, events in leagues.items():
-            # Skip if no events in this league
-            if not events:
-                continue
-
-            # Check if sleep time has been reached
-            if is_sleep_time():
-                print("\nSleep time reached, stopping display...")
-                matrix.Clear()
-                return
-
-            league_badge_path = events[0].league_badge_path if events else None
-
-            # Display league header
-            _show_league_screen(canvas, matrix, font, league_name, league_badge_path)
-            time.sleep(LEAGUE_DISPLAY_TIME)
-
-            # Display each game in this league
-            for event in events:
-                # Check if sleep time has been reached
-                if is_sleep_time():
-                    print("\nSleep time reached, stopping display...")
-                    matrix.Clear()
-                    return
-
-                # First show team badges for 5 seconds
-                _show_team_badges_screen(canvas, matrix, event)
-                time.sleep(5)
-
-                # Then show the full game screen
-                _show_game_screen(canvas, matrix, font, event)
-                time.sleep(EVENT_DISPLAY_TIME - 5)
-    except KeyboardInterrupt:
-        print("\n\nShutting down display...")
-    finally:
-        matrix.Clear()
-
-
-def _show_league_screen(
-    canvas, matrix, font, league_name: str, badge_path: Path | None
-) -> None:
-    """Display league badge on left and name on right, vertically centered."""
-    canvas.Clear()
-
-    # Matrix dimensions
-    width = canvas.width  # 64
-    height = canvas.height  # 32
-
-    # Load and display league badge if available
-    if badge_path and badge_path.exists():
-        image = Image.open(badge_path).convert("RGB")
+            slots.append(
+                Slot(
+                    league_name,
+                    event,
+                    config.EVENT_DISPLAY_TIME,
+                    min(config.MIN_SCREEN_TIME, config.EVENT_DISPLAY_TIME),
+                )
+            )
+
+    screens = []
+    for slot in fit_to_budget(slots, config.CYCLE_BUDGET):
+        if slot.event is None:
+            screens.append(
+                Screen("league", slot.hold, slot.league, league_badges[slot.league])
+            )
+            continue
+        # First show team badges for 5 seconds (less when the game is
+        # shortened), then the full game screen
+        badges_hold = min(BADGES_DISPLAY_TIME, slot.hold / 3)
+        screens.append(Screen("badges", badges_hold, slot.league, event=slot.event))
+        screens.append(
+            Screen("game", slot.hold - badges_hold, slot.league, event=slot.event)
+        )
+    return screens
+
+
+def _rotation_ended(screen: Screen, updated: Callable[[], bool] | None) -> bool:
+    """Whether to stop before this screen: sleep time, or newer scores to show."""
+    # Badges lead straight into the game
+    if screen.kind == "badges":
+        return False
+    if is_sleep_time():
+        logger.info("Sleep time reached, stopping display")
+        return True
+    if updated and updated():
+        logger.info("New scores received, restarting rotation")
+        return True
+    return False
+
+
+def display_scores(data: SportsData, updated: Callable[[], bool] | None = None) -> None:
+    """
+    Display sports scores organized by league.
+    Shows league info first, then iterates through each game.
 
-        # Resize image to fit on left side (max 28x28 to leave room for text)
-        max_size = min(28, height - 4)
-        aspect_ratio = image.width / image.height
+    Uses the backend selected by DISPLAY_MODE (matrix, console or memory).
+    Settings reloaded while a screen is held apply from the next screen.
 
-        if aspect_ratio > 1:  # Wider than tall
-            new_width = max_size
-            new_height = int(max_size / aspect_ratio)
-        else:  # Taller than wide
-            new_height = max_size
-            new_width = int(max_size * aspect_ratio)
+    Args:
+        data: SportsData object containing events to display
+        updated: Returns True once newer scores are waiting (pushed by the
+            hub), which ends the rotation before the next screen
+    """
+    if not data or not data.events:
+        logger.info("No events to display")
+        watchdog.hold_frame(config.TRY_AGAIN_INTERVAL)
+        config_reload.wait(config.TRY_AGAIN_INTERVAL)
+        return
 
-        image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    # Ctrl-C goes through to the runtime, which releases the display
+    for screen in build_rotation(data):
+        if _rotation_ended(screen, updated):
+            return
 
-        # Place image on left side, vertically centered
-        x_pos = 2
-        y_pos = (height - new_height) // 2
+        # A reload may have replaced the backend (new panel settings)
+        _render(get_backend(), screen)
+        watchdog.hold_frame(screen.hold)
+        config_reload.wait(screen.hold)
 
-        canvas.SetImage(image, x_pos, y_pos)
 
-        # Calculate text position (right of image)
-        text_x = x_pos + new_width + 4  # 4 pixels padding
-    else:
-        # No image, display text in center
-        text_x = (width - len(league_name) * 6) // 2
+async def display_scores_async(
+    data: SportsData, updated: Callable[[], bool] | None = None
+) -> None:
+    """
+    Asyncio version of display_scores().
+    Screen holds are awaited so fetches and downloads can run in between.
 
-    # Draw league name on right side, vertically centered
-    text_color = graphics.Color(255, 255, 255)
-    text_y = height // 2 + 4  # Adjust for font baseline
+    Args:
+        data: SportsData object containing events to display
+        updated: Returns True once newer scores are waiting, which ends the
+            rotation before the next screen
+    """
+    if not data or not data.events:
+        logger.info("No events to display")
+        watchdog.hold_frame(config.TRY_AGAIN_INTERVAL)
+        await config_reload.wait_async(config.TRY_AGAIN_INTERVAL)
+        return
 
-    graphics.DrawText(canvas, font, text_x, text_y, text_color, league_name)
+    for screen in build_rotation(data):
+        if _rotation_ended(screen, updated):
+            return
 
-    canvas = matrix.SwapOnVSync(canvas)
+        _render(get_backend(), screen)
+        watchdog.hold_frame(screen.hold)
+        await config_reload.wait_async(screen.hold)
 
 
-def _show_team_badges_screen(canvas, matrix, event) -> None:
-    """Display team badges only - one on left, one on right."""
-    canvas.Clear()
-
-    # Matrix dimensions
-    width = canvas.width  # 64
-    height = canvas.height  # 32
-
-    # Badge size - larger since we're only showing badges
-    badge_size = 28  # Max size for badges
-
-    # Team 1 badge on left
-    if event.team_one.badge_path and event.team_one.badge_path.exists():
-        image1 = Image.open(event.team_one.badge_path).convert("RGB")
-        aspect_ratio = image1.width / image1.height
-
-        if aspect_ratio > 1:
-            new_width = badge_size
-            new_height = int(badge_size / aspect_ratio)
-        else:
-            new_height = badge_size
-            new_width = int(badge_size * aspect_ratio)
-
-        image1 = image1.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-        # Center vertically on left side
-        x_pos = 2
-        y_pos = (height - new_height) // 2
-        canvas.SetImage(image1, x_pos, y_pos)
-
-    # Team 2 badge on right
-    if event.team_two.badge_path and event.team_two.badge_path.exists():
-        image2 = Image.open(event.team_two.badge_path).convert("RGB")
-        aspect_ratio = image2.width / image2.height
-
-        if aspect_ratio > 1:
-            new_width = badge_size
-            new_height = int(badge_size / aspect_ratio)
-        else:
-            new_height = badge_size
-            new_width = int(badge_size * aspect_ratio)
-
-        image2 = image2.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-        # Center vertically on right side
-        x_pos_right = width - new_width - 2
-        y_pos = (height - new_height) // 2
-        canvas.SetImage(image2, x_pos_right, y_pos)
-
-    canvas = matrix.SwapOnVSync(canvas)
-
-
-def _show_game_screen(canvas, matrix, font, event) -> None:
-    """Display game info with team badges and scores."""
-    canvas.Clear()
-
-    # Matrix dimensions
-    width = canvas.width  # 64
-
-    # Text colors
-    white = graphics.Color(255, 255, 255)
-    green = graphics.Color(0, 255, 0)
-
-    # Display team badges on top row
-    badge_size = 16  # Max size for badges
-    y_badge = 1
-
-    # Team 1 badge on left
-    if event.team_one.badge_path and event.team_one.badge_path.exists():
-        image1 = Image.open(event.team_one.badge_path).convert("RGB")
-        aspect_ratio = image1.width / image1.height
-
-        if aspect_ratio > 1:
-            new_width = badge_size
-            new_height = int(badge_size / aspect_ratio)
-        else:
-            new_height = badge_size
-            new_width = int(badge_size * aspect_ratio)
-
-        image1 = image1.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        canvas.SetImage(image1, 2, y_badge)
-
-    # Team 2 badge on right
-    if event.team_two.badge_path and event.team_two.badge_path.exists():
-        image2 = Image.open(event.team_two.badge_path).convert("RGB")
-        aspect_ratio = image2.width / image2.height
-
-        if aspect_ratio > 1:
-            new_width = badge_size
-            new_height = int(badge_size / aspect_ratio)
-        else:
-            new_height = badge_size
-            new_width = int(badge_size * aspect_ratio)
-
-        image2 = image2.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        # Position on right side
-        x_pos_right = width - new_width - 2
-        canvas.SetImage(image2, x_pos_right, y_badge)
-
-    # Display scores or date/time on second line (centered)
-    y_text = 24
-    last_line_text = ""
-    if event.status_type == "STATUS_SCHEDULED":
-        # Display date and time for scheduled games
-        # Format: "Dec 7 7:30P" or similar compact format
-        info_text = f"{event.formatted_date}"
-        last_line_text = f"{event.time}"
-        info_x = calculate_centered_x(info_text, width)
-        graphics.DrawText(canvas, font, info_x, y_text, white, info_text)
-    else:
-        # Display scores for live/completed games
-        score1_text = str(event.team_one.score)
-        score2_text = str(event.team_two.score)
-        full_score_text = f"{score1_text} - {score2_text}"
+def render_rotation(data: SportsData) -> None:
+    """
+    Render every screen of one rotation back to back, without holding them.
+    Used to profile rendering.
 
-        # Center the entire score text
-        char_width = 5
-        start_x = calculate_centered_x(full_score_text, width, char_width)
+    Args:
+        data: SportsData object containing events to display
+    """
+    backend = get_backend()
+    for screen in build_rotation(data):
+        _render(backend, screen)
 
-        # Draw team 1 score
-        graphics.DrawText(canvas, font, start_x, y_text, green, score1_text)
 
-        # Calculate position for dash (after score1)
-        dash_x = start_x + len(score1_text) * char_width
-        graphics.DrawText(canvas, font, dash_x, y_text, white, " - ")
+def screen_layout(screen: Screen, width: int, height: int) -> DrawList:
+    """
+    The draw list of a screen (cached, see display.layout).
 
-        # Calculate position for score2 (after dash)
-        score2_x = dash_x + 3 * char_width  # " - " is 3 characters
-        graphics.DrawText(canvas, font, score2_x, y_text, green, score2_text)
+    Args:
+        screen: The screen to lay out
+        width: Display width
+        height: Display height
 
-        # Determine last line text based on status
-        if event.status_type == "STATUS_FINAL":
-            last_line_text = event.winner_text
-        else:
-            last_line_text = event.status[:10]  # Truncate if too long
+    Returns:
+        The draw list
+    """
+    if screen.kind == "league":
+        return league_layout(screen.league, screen.badge_path, width, height)
+    event = screen.event
+    if event is None:
+        return ()
+    if screen.kind == "badges":
+        return badges_layout(
+            event.team_one.badge_path, event.team_two.badge_path, width, height
+        )
+    return event_layout(event, width)
+
+
+def screen_summary(screen: Screen) -> list[str]:
+    """
+    What a screen shows, as lines of text (for the console backend).
 
-    # Display status on third line, centered
-    y_status = 31
-    last_line_x = calculate_centered_x(last_line_text, width)
-    graphics.DrawText(canvas, font, last_line_x, y_status, white, last_line_text)
+    Args:
+        screen: The screen to describe
 
-    canvas = matrix.SwapOnVSync(canvas)
+    Returns:
+        The lines
+    """
+    if screen.kind == "league":
+        return [f"LEAGUE: {screen.league}", f"Badge: {screen.badge_path}"]
+    event = screen.event
+    if event is None:
+        return []
+    teams = f"{event.team_one.full_name} vs {event.team_two.full_name}"
+    if screen.kind == "badges":
+        return [
+            teams,
+            f"Team 1 Badge: {event.team_one.badge_path}",
+            f"Team 2 Badge: {event.team_two.badge_path}",
+        ]
+    return [
+        teams,
+        f"Status: {event.status}",
+        f"Score: {event.team_one.score} - {event.team_two.score}",
+        f"Date/Time: {event.date} at {event.time}",
+    ]
+
+
+def _render(backend: DisplayBackend, screen: Screen) -> None:
+    with metrics.RENDER_SECONDS.time(screen=screen.kind):
+        backend.describe(screen_summary(screen))
+        backend.show(screen_layout(screen, backend.width, backend.height))
 
 
 if __name__ == "__main__":
     from api.sports_api import fetch_scores
+    from utils.logging_setup import setup_logging
 
+    setup_logging()
     print("Testing display module...")
     data = fetch_scores()
 
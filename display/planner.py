@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Fits the display rotation into CYCLE_BUDGET seconds, so the scores are
+fetched again at least that often however crowded the slate is.
+
+Screen time is given by priority: live games first, then finished games
+(most recent first), then upcoming games (soonest first). When the full
+rotation is too long, screens are first shortened down to MIN_SCREEN_TIME,
+lowest priority first, then the least important games are dropped. The most
+important game is always kept, shortened below MIN_SCREEN_TIME if that is
+what it takes to fit.
+"""
+
+import logging
+from collections import Counter
+from dataclasses import dataclass
+
+from models import Event
+
+logger = logging.getLogger(__name__)
+
+# Priority tiers, most important first
+LIVE = 0
+FINAL = 1
+SCHEDULED = 2
+# League headers are shortened before any game
+HEADER = 3
+
+
+@dataclass(slots=True)
+class Slot:
+    """A league header or a game, and the time it gets in the rotation."""
+
+    league: str
+    event: Event | None
+    full: float
+    minimum: float
+    hold: float = 0.0
+
+    @property
+    def tier(self) -> int:
+        if self.event is None:
+            return HEADER
+        if self.event.is_in_progress:
+            return LIVE
+        if self.event.is_final:
+            return FINAL
+        return SCHEDULED
+
+
+def _drop_rank(slot: Slot) -> tuple[int, float]:
+    """Sort key of the games, the highest is dropped first."""
+    event = slot.event
+    when = event.date_obj.timestamp() if event and event.date_obj else None
+    if when is None:
+        return slot.tier, float("inf")
+    # The oldest finished games and the furthest upcoming games go first
+    return slot.tier, -when if slot.tier == FINAL else when
+
+
+def fit_to_budget(slots: list[Slot], budget: float) -> list[Slot]:
+    """
+    Set the hold of each slot so the rotation fits in the budget.
+
+    Args:
+        slots: The rotation in display order (headers and games)
+        budget: Longest rotation (seconds), 0 for no limit
+
+    Returns:
+        The slots kept, in display order, with their hold set
+    """
+    for slot in slots:
+        slot.hold = slot.full
+    total = sum(slot.full for slot in slots)
+    if budget <= 0 or total <= budget:
+        return slots
+
+    # Shorten screens, lowest priority first
+    for tier in (HEADER, SCHEDULED, FINAL, LIVE):
+        excess = sum(slot.hold for slot in slots) - budget
+        if excess <= 0:
+            break
+        members = [slot for slot in slots if slot.tier == tier]
+        slack = sum(slot.hold - slot.minimum for slot in members)
+        if slack <= 0:
+            continue
+        ratio = min(1.0, excess / slack)
+        for slot in members:
+            slot.hold -= (slot.hold - slot.minimum) * ratio
+
+    # Still too long: drop the least important games, always keeping one
+    dropped: set[int] = set()
+    remaining = sum(slot.hold for slot in slots)
+    headers = {slot.league: slot for slot in slots if slot.event is None}
+    games = [slot for slot in slots if slot.event is not None]
+    games_left = Counter(slot.league for slot in games)
+    for slot in sorted(games, key=_drop_rank, reverse=True)[:-1]:
+        if remaining <= budget:
+            break
+        dropped.add(id(slot))
+        remaining -= slot.hold
+        games_left[slot.league] -= 1
+        # A league without games left loses its header too
+        header = headers.get(slot.league)
+        if not games_left[slot.league] and header:
+            dropped.add(id(header))
+            remaining -= header.hold
+
+    kept = [slot for slot in slots if id(slot) not in dropped]
+    # The one game left and its header can still be over budget
+    if remaining > budget:
+        ratio = budget / remaining
+        for slot in kept:
+            slot.hold *= ratio
+
+    logger.info(
+        "Rotation fitted to budget",
+        extra={
+            "budget": budget,
+            "full": round(total),
+            "planned": round(sum(slot.hold for slot in kept)),
+            "dropped": sum(1 for slot in games if id(slot) in dropped),
+        },
+    )
+    return kept
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Low-power sleep mode: the matrix driver is released for the night, while the
+sprite and layout caches stay in memory so waking up needs no image work.
+"""
+
+import logging
+
+from models import SportsData
+from utils import watchdog
+
+from .backends import display_size, release_backend
+from .matrix_display import build_rotation, screen_layout
+from .sleep_messages import show_goodmorning_message, show_goodnight_message
+
+logger = logging.getLogger(__name__)
+
+
+def power_down() -> None:
+    """Say goodnight, then release the display until power_up()."""
+    # No frames or fetches to expect until wake time
+    watchdog.suspend()
+    show_goodnight_message()
+    release_backend()
+
+
+def power_up() -> None:
+    """Take the display back (the driver is created again) and say hello."""
+    watchdog.resume()
+    show_goodmorning_message()
+
+
+def warm_caches(data: SportsData) -> None:
+    """
+    Lay out every screen of the next rotation, loading and resizing its badges,
+    so the first rotation after waking only has to draw.
+
+    Args:
+        data: The pre-fetched scores
+    """
+    width, height = display_size()
+    screens = build_rotation(data)
+    for screen in screens:
+        screen_layout(screen, width, height)
+    logger.info("Display caches warmed", extra={"screens": len(screens)})
@@ -1,15 +1,55 @@
 #!/usr/bin/env python3
 """
 Main program for displaying sports scores in a continuous loop.
+
+Startup is ordered for a fast first frame: the boot frame (last snapshot) is
+shown before the HTTP clients, the hub and the runtime are imported.
 """
 
-import time
+import logging
+from typing import TYPE_CHECKING
+
+from config import (
+    DISPLAY_MODE,
+    HUB_BIND,
+    HUB_MODE,
+    HUB_PORT,
+    HUB_URL,
+    PROFILE_CYCLES,
+    RUNTIME_MODE,
+)
+from utils.logging_setup import setup_logging
+from utils.startup import StartupTimer
+
+if TYPE_CHECKING:
+    from api.hub import HubClient, ScoreHub
+
+logger = logging.getLogger(__name__)
+
+
+def start_hub() -> tuple["ScoreHub | None", "HubClient | None"]:
+    """
+    Start the fan-out hub or hub client selected by HUB_MODE.
+
+    Returns:
+        The running hub (hub mode) and hub client (client mode), if any
+    """
+    if HUB_MODE == "off":
+        return None, None
+
+    from api.hub import HubClient, ScoreHub
 
-from api.sports_api import fetch_scores
-from config import DISPLAY_MODE, TRY_AGAIN_INTERVAL
-from display import display_scores
-from display.sleep_messages import show_goodmorning_message, show_goodnight_message
-from utils import is_sleep_time, time_until_wake
+    if HUB_MODE == "hub":
+        hub = ScoreHub(HUB_PORT, HUB_BIND)
+        hub.start()
+        return hub, None
+
+    if HUB_MODE == "client":
+        client = HubClient(HUB_URL)
+        client.start()
+        return None, client
+
+    return None, None
 
 
 def main():
@@ -18,49 +58,44 @@ def main():
     Continuously fetches and displays sports scores.
     Respects sleep schedule configuration.
     """
-    print(f"Starting sports score display... (mode: {DISPLAY_MODE})")
-
-    while True:
-        try:
-            # Check if we're in sleep mode
-            if is_sleep_time():
-                sleep_seconds = time_until_wake()
-                hours = sleep_seconds // 3600
-                minutes = (sleep_seconds % 3600) // 60
-                print("\n💤 Sleep mode - Display off until wake time")
-                print(f"Sleeping for {hours}h {minutes}m...")
-
-                # Show goodnight message on matrix before sleeping
-                if DISPLAY_MODE == "matrix":
-                    show_goodnight_message()
-
-                time.sleep(sleep_seconds)
-                print("🌅 Wake time - Resuming display...")
-
-                # Show good morning message on matrix after waking
-                if DISPLAY_MODE == "matrix":
-                    show_goodmorning_message()
-
-                continue
-
-            # Fetch current scores
-            print("\n\nFetching latest scores...")
-            sports_data = fetch_scores()
-
-            if sports_data:
-                # Display all scores (organized by league)
-                display_scores(sports_data)
-            else:
-                print("Failed to fetch scores. Retrying in 5 minutes...")
-                time.sleep(TRY_AGAIN_INTERVAL)
-
-        except KeyboardInterrupt:
-            print("\n\nShutting down...")
-            break
-        except Exception as e:
-            print(f"\nError: {e}")
-            print("Retrying in 5 minutes...")
-            time.sleep(TRY_AGAIN_INTERVAL)
+    timer = StartupTimer()
+    with timer.phase("logging"):
+        setup_logging()
+    logger.info(
+        "Starting sports score display",
+        extra={"mode": DISPLAY_MODE, "runtime": RUNTIME_MODE},
+    )
+
+    if PROFILE_CYCLES:
+        from runtime.profile_runtime import run_profile
+
+        run_profile(PROFILE_CYCLES)
+        return
+
+    with timer.phase("boot_frame"):
+        from display.boot import show_boot_frame
+
+        show_boot_frame()
+
+    with timer.phase("imports"):
+        # Only the runtime used is imported, the sync one does not need aiohttp
+        if RUNTIME_MODE == "async":
+            from runtime import run_async
+        else:
+            from runtime.sync_runtime import run_sync
+        from utils import config_reload, metrics, watchdog
+
+    with timer.phase("services"):
+        metrics.start_metrics_exporter()
+        hub, client = start_hub()
+        config_reload.start_config_watch()
+        watchdog.start_watchdog()
+
+    timer.report()
+    if RUNTIME_MODE == "async":
+        run_async(hub, client)
+    else:
+        run_sync(hub, client)
 
 
 if __name__ == "__main__":
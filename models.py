@@ -1,10 +1,37 @@
 #!/usr/bin/env python3
-from dataclasses import dataclass, field
+import sys
+from dataclasses import dataclass, field, fields
 from datetime import datetime
+from enum import Enum
 from pathlib import Path
 
 
-@dataclass
+# StrEnum needs Python 3.11
+class StatusType(str, Enum):  # noqa: UP042
+    """The known event status types (compares equal to the raw API string)."""
+
+    SCHEDULED = "STATUS_SCHEDULED"
+    IN_PROGRESS = "STATUS_IN_PROGRESS"
+    FINAL = "STATUS_FINAL"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+def _intern(value):
+    """Intern repeated strings (league names, badge URLs...) shared by many events."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _status_type(value):
+    """Map a status type to its StatusType member, interning unknown values."""
+    try:
+        return StatusType(value)
+    except ValueError:
+        return _intern(value)
+
+
+@dataclass(slots=True)
 class Team:
     """Represents a team in a sports event."""
 
@@ -16,13 +43,19 @@ class Team:
     score: int
     badge_path: Path | None = field(default=None, repr=False)
 
+    def __post_init__(self) -> None:
+        self.badge = _intern(self.badge)
+        self.location = _intern(self.location)
+        self.name = _intern(self.name)
+        self.abbreviation = _intern(self.abbreviation)
+
     @property
     def full_name(self) -> str:
         """Returns the full team name (location + name)."""
         return f"{self.location} {self.name}"
 
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     """Represents a sports event/game."""
 
@@ -36,56 +69,84 @@ class Event:
     team_one: Team
     team_two: Team
     league_badge_path: Path | None = field(default=None, repr=False)
+    # Derived once from `date` when the event is created
+    date_obj: datetime | None = field(
+        init=False, default=None, repr=False, compare=False
+    )
+    formatted_date: str = field(init=False, default="", repr=False, compare=False)
+    _winner_text: str | None = field(
+        init=False, default=None, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self.status = _intern(self.status)
+        self.status_type = _status_type(self.status_type)
+        self.league = _intern(self.league)
+        self.league_badge = _intern(self.league_badge)
+
+        # Convert date from 'Dec 07 2025' format to 'Dec 7' format
+        try:
+            self.date_obj = datetime.strptime(self.date, "%b %d %Y")
+            # Format without leading zero in day
+            self.formatted_date = self.date_obj.strftime("%b %-d")
+        except (TypeError, ValueError):
+            # If parsing fails, use the original date
+            self.formatted_date = self.date
+
+    def update(self, newer: "Event") -> None:
+        """
+        Take the values of a newer version of this event, in place, so screens
+        holding it show them. Badges already found for the same URLs are kept.
+
+        Args:
+            newer: The same event, parsed from a later response
+        """
+        for team, newer_team in (
+            (self.team_one, newer.team_one),
+            (self.team_two, newer.team_two),
+        ):
+            if newer_team.badge_path is None and newer_team.badge == team.badge:
+                newer_team.badge_path = team.badge_path
+        if newer.league_badge_path is None and newer.league_badge == self.league_badge:
+            newer.league_badge_path = self.league_badge_path
+
+        for value in fields(self):
+            setattr(self, value.name, getattr(newer, value.name))
 
     @property
     def is_scheduled(self) -> bool:
         """Check if event is scheduled."""
-        return self.status_type == "STATUS_SCHEDULED"
+        return self.status_type == StatusType.SCHEDULED
 
     @property
     def is_in_progress(self) -> bool:
         """Check if event is currently in progress."""
-        return self.status_type == "STATUS_IN_PROGRESS"
+        return self.status_type == StatusType.IN_PROGRESS
 
     @property
     def is_final(self) -> bool:
         """Check if event is finished."""
-        return self.status_type == "STATUS_FINAL"
-
-    @property
-    def formatted_date(self) -> str:
-        """
-        Convert date from 'Dec 07 2025' format to 'Dec 7' format.
-
-        Returns:
-            Formatted date string without leading zeros and year
-        """
-        try:
-            # Parse the date string
-            date_obj = datetime.strptime(self.date, "%b %d %Y")
-            # Format without leading zero in day
-            return date_obj.strftime("%b %-d")
-        except ValueError:
-            # If parsing fails, return original date
-            return self.date
+        return self.status_type == StatusType.FINAL
 
     @property
     def winner_text(self) -> str:
         """
-        Get the winner text for a final game.
+        Get the winner text for a final game (computed once).
 
         Returns:
             Text displaying the winner's name or "Tie!" if scores are equal
         """
-        if self.team_one.score > self.team_two.score:
-            return f"{self.team_one.name} win!"
-        elif self.team_two.score > self.team_one.score:
-            return f"{self.team_two.name} win!"
-        else:
-            return "Tie!"
+        if self._winner_text is None:
+            if self.team_one.score > self.team_two.score:
+                self._winner_text = f"{self.team_one.name} win!"
+            elif self.team_two.score > self.team_one.score:
+                self._winner_text = f"{self.team_two.name} win!"
+            else:
+                self._winner_text = "Tie!"
+        return self._winner_text
 
 
-@dataclass
+@dataclass(slots=True)
 class SportsData:
     """Container for all sports events."""
 
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""Alternative runtimes for the score display loop."""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .async_runtime import run_async
+
+__all__ = ["run_async"]
+
+
+def __getattr__(name: str) -> Any:
+    # Imported on first use, the other runtimes run without aiohttp installed
+    if name != "run_async":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = importlib.import_module(".async_runtime", __name__).run_async
+    globals()[name] = value
+    return value
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Asyncio runtime: polling, badge downloads and the display rotation run as
+cooperative tasks sharing one pooled HTTP client.
+"""
+
+import asyncio
+import logging
+import signal
+from collections.abc import Callable
+
+import config
+from api.async_client import create_session, fetch_scores_async
+from api.hub import HubClient, ScoreHub
+from api.sports_api import pause_streams, resume_streams
+from display.backends import release_backend
+from display.matrix_display import display_scores_async
+from display.power import power_down, power_up, warm_caches
+from models import SportsData
+from utils import (
+    config_reload,
+    is_sleep_time,
+    metrics,
+    sleep_remaining,
+    time_until_wake,
+    watchdog,
+)
+from utils.resilience import Backoff
+from utils.snapshot import save_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreState:
+    """The latest fetched scores, shared between the poll and display tasks."""
+
+    def __init__(self) -> None:
+        self.latest: SportsData | None = None
+        self.ready = asyncio.Event()
+
+    def update(self, data: SportsData) -> None:
+        self.latest = data
+        self.ready.set()
+
+    def replaced(self, data: SportsData) -> Callable[[], bool]:
+        """A check that newer scores than `data` have arrived."""
+        return lambda: self.latest is not data
+
+
+async def _poll_scores(
+    session, state: ScoreState, hub: ScoreHub | None, client: HubClient | None
+) -> None:
+    """
+    Fetch scores every FETCH_INTERVAL seconds, outside the sleep window.
+    While sleeping, fetch once PREFETCH_BEFORE_WAKE seconds before wake time.
+    """
+    retry = Backoff()
+    while True:
+        try:
+            await _poll_once(session, state, hub, client, retry)
+        except Exception:
+            # e.g. the snapshot on a full SD card, the display keeps going
+            retry_in = retry.next_delay()
+            logger.exception(
+                "Unexpected error while fetching scores",
+                extra={"retry_in": round(retry_in)},
+            )
+            watchdog.hold_frame(retry_in)
+            await config_reload.wait_async(retry_in)
+
+
+async def _poll_once(
+    session,
+    state: ScoreState,
+    hub: ScoreHub | None,
+    client: HubClient | None,
+    retry: Backoff,
+) -> None:
+    """One fetch, and the wait until the next one."""
+    sleeping = is_sleep_time()
+    if sleeping:
+        wait = time_until_wake() - config.PREFETCH_BEFORE_WAKE
+        if wait > 0:
+            # Reloads are applied while sleeping, the sleep window may change
+            await config_reload.wait_async(
+                lambda: sleep_remaining(config.PREFETCH_BEFORE_WAKE)
+            )
+            return
+        logger.info("Pre-fetching scores before wake time")
+        resume_streams()
+        if client:
+            client.resume()
+    else:
+        logger.info("Fetching latest scores")
+
+    if client:
+        # Scores are pushed by the hub, just pick up the latest
+        sports_data = await asyncio.to_thread(client.fetch_scores)
+    else:
+        sports_data = await fetch_scores_async(session)
+
+    if sports_data:
+        watchdog.fetch_succeeded()
+        state.update(sports_data)
+        if hub:
+            hub.publish(sports_data)
+        await asyncio.to_thread(save_snapshot, sports_data)
+        retry.reset()
+        if sleeping and is_sleep_time():
+            # Display is still off, get the first rotation ready
+            await asyncio.to_thread(warm_caches, sports_data)
+            # One extra second so the schedule is past the wake minute
+            await config_reload.wait_async(lambda: sleep_remaining(-1))
+        elif client:
+            # Pick up scores pushed by the hub as soon as they arrive
+            await asyncio.to_thread(client.received.wait, config.FETCH_INTERVAL)
+        else:
+            await config_reload.wait_async(config.FETCH_INTERVAL)
+    else:
+        retry_in = retry.next_delay()
+        logger.warning("Failed to fetch scores", extra={"retry_in": round(retry_in)})
+        # The rotation may be waiting for the first scores
+        watchdog.hold_frame(retry_in)
+        await config_reload.wait_async(retry_in)
+
+
+async def _rotate_display(state: ScoreState, client: HubClient | None) -> None:
+    """
+    Show the latest scores, picking up new data at the start of each rotation.
+    Peer boards start a new rotation as soon as the hub pushes newer scores.
+    """
+    while True:
+        try:
+            await _rotate_once(state, client)
+        except Exception:
+            # A backend or sleep message error, try again later
+            logger.exception(
+                "Unexpected error in display",
+                extra={"retry_in": config.TRY_AGAIN_INTERVAL},
+            )
+            watchdog.hold_frame(config.TRY_AGAIN_INTERVAL)
+            await config_reload.wait_async(config.TRY_AGAIN_INTERVAL)
+
+
+async def _rotate_once(state: ScoreState, client: HubClient | None) -> None:
+    """One rotation, or the sleep window."""
+    if is_sleep_time():
+        sleep_seconds = time_until_wake()
+        hours = sleep_seconds // 3600
+        minutes = (sleep_seconds % 3600) // 60
+        logger.info(
+            "💤 Sleep mode - Display off until wake time",
+            extra={"sleep_for": f"{hours}h{minutes}m"},
+        )
+        metrics.SLEEP_PERIODS.inc()
+
+        # The messages hold the display for a while, keep them off the event
+        # loop. The display is released until wake time, the poll task
+        # resumes the hub client and the streams when it pre-fetches.
+        await asyncio.to_thread(power_down)
+        pause_streams()
+        if client:
+            client.pause()
+
+        # One extra second so the schedule is past the wake minute
+        await config_reload.wait_async(lambda: sleep_remaining(-1))
+        logger.info("🌅 Wake time - Resuming display")
+        await asyncio.to_thread(power_up)
+        return
+
+    await state.ready.wait()
+    data = state.latest
+    if data:
+        await display_scores_async(data, state.replaced(data) if client else None)
+
+
+async def _main(hub: ScoreHub | None, client: HubClient | None) -> None:
+    state = ScoreState()
+    # SIGHUP handled on the loop, which takes over the signal wakeup fd
+    asyncio.get_running_loop().add_signal_handler(
+        signal.SIGHUP, config_reload.request_reload
+    )
+    async with create_session() as session:
+        await asyncio.gather(
+            _poll_scores(session, state, hub, client), _rotate_display(state, client)
+        )
+
+
+def run_async(hub: ScoreHub | None = None, client: HubClient | None = None) -> None:
+    """
+    Run the display until interrupted using the asyncio runtime.
+
+    Args:
+        hub: Hub to publish fetched scores to (hub mode)
+        client: Hub client to take scores from instead of the API (client mode)
+    """
+    try:
+        asyncio.run(_main(hub, client))
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        release_backend()
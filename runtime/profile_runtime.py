@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Profiling runtime: runs PROFILE_CYCLES display cycles back to back (no screen
+holds) and writes the results to PROFILE_DIR.
+
+Each cycle goes through fetch_scores() and render_rotation(), the same path as
+the display loop: concurrent sources, streaming parse, deltas, circuit
+breakers and badge downloads. The cycles are run once for CPU time, then
+again for memory if PROFILE_MEMORY is on.
+
+Works with DISPLAY_MODE=memory (or console) so it can run off the Pi.
+"""
+
+import logging
+
+from api.sports_api import fetch_scores
+from config import (
+    API_SOURCES,
+    PROFILE_DIR,
+    PROFILE_MEMORY,
+    PROFILE_SAMPLE_INTERVAL,
+)
+from display.matrix_display import render_rotation
+from utils.profiling import Profiler
+
+logger = logging.getLogger(__name__)
+
+
+def _profile_cycle(profiler: Profiler) -> bool:
+    """One display cycle, split into stages. Returns False if the fetch failed."""
+    with profiler.stage("fetch"):
+        data = fetch_scores()
+    if not data:
+        return False
+
+    with profiler.stage("render"):
+        render_rotation(data)
+    return True
+
+
+def _profile_pass(cycles: int, memory: bool) -> None:
+    profiler = Profiler(PROFILE_DIR, PROFILE_SAMPLE_INTERVAL / 1000, memory)
+    failed = 0
+    profiler.start()
+    try:
+        for cycle in range(cycles):
+            profiler.cycle = cycle
+            try:
+                if not _profile_cycle(profiler):
+                    failed += 1
+                    logger.warning(
+                        "Profiling cycle failed to fetch", extra={"cycle": cycle}
+                    )
+            except Exception:
+                failed += 1
+                logger.exception("Profiling cycle failed", extra={"cycle": cycle})
+    finally:
+        profiler.stop()
+    logger.info(
+        "Profiling pass done",
+        extra={
+            "pass": "memory" if memory else "cpu",
+            "cycles": cycles,
+            "failed": failed,
+        },
+    )
+
+
+def run_profile(cycles: int) -> None:
+    """
+    Profile a number of display cycles.
+
+    Args:
+        cycles: How many fetch/render cycles to run per pass
+    """
+    if not API_SOURCES:
+        logger.error("API_URL not configured in .env file")
+        return
+
+    logger.info("Profiling", extra={"cycles": cycles, "path": PROFILE_DIR})
+    _profile_pass(cycles, memory=False)
+    if PROFILE_MEMORY:
+        _profile_pass(cycles, memory=True)
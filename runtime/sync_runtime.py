@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+The default runtime: one blocking loop that fetches the scores, then shows
+one rotation of them.
+"""
+
+import logging
+
+import config
+from api.hub import HubClient, ScoreHub
+from api.sports_api import fetch_scores, pause_streams, resume_streams
+from display import display_scores
+from display.backends import release_backend
+from display.power import power_down, power_up, warm_caches
+from models import SportsData
+from utils import (
+    config_reload,
+    is_sleep_time,
+    metrics,
+    sleep_remaining,
+    time_until_wake,
+    watchdog,
+)
+from utils.resilience import Backoff
+from utils.snapshot import save_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def sleep_until_wake(
+    hub: ScoreHub | None, client: HubClient | None
+) -> SportsData | None:
+    """
+    Low-power sleep: release the display and pause the hub client and the
+    score streams until PREFETCH_BEFORE_WAKE seconds before wake time, then
+    fetch the scores and warm the display caches while the display is still off.
+
+    Args:
+        hub: The hub to publish the pre-fetched scores to, if any
+        client: The hub client to pause, if any
+
+    Returns:
+        The pre-fetched scores, or None if the fetch failed
+    """
+    sleep_seconds = time_until_wake()
+    hours = sleep_seconds // 3600
+    minutes = (sleep_seconds % 3600) // 60
+    logger.info(
+        "💤 Sleep mode - Display off until wake time",
+        extra={"sleep_for": f"{hours}h{minutes}m"},
+    )
+    metrics.SLEEP_PERIODS.inc()
+
+    power_down()
+    pause_streams()
+    if client:
+        client.pause()
+
+    # Reloads are applied while sleeping, the sleep window may change
+    config_reload.wait(lambda: sleep_remaining(config.PREFETCH_BEFORE_WAKE))
+
+    logger.info("Pre-fetching scores before wake time")
+    resume_streams()
+    if client:
+        client.resume()
+        sports_data = None
+    else:
+        sports_data = fetch_scores()
+        if sports_data:
+            if hub:
+                hub.publish(sports_data)
+            warm_caches(sports_data)
+
+    # One extra second so the schedule is past the wake minute
+    config_reload.wait(lambda: sleep_remaining(-1))
+    logger.info("🌅 Wake time - Resuming display")
+    power_up()
+    return sports_data
+
+
+def run_sync(hub: ScoreHub | None, client: HubClient | None) -> None:
+    """
+    Continuously fetch and display sports scores.
+    Respects sleep schedule configuration.
+
+    Args:
+        hub: Publishes each fetch to the peer boards (hub mode)
+        client: Receives the scores from the hub instead of fetching (client mode)
+    """
+    retry = Backoff()
+    prefetched: SportsData | None = None
+    sports_data: SportsData | None
+    while True:
+        try:
+            # Check if we're in sleep mode
+            if is_sleep_time():
+                prefetched = sleep_until_wake(hub, client)
+                continue
+
+            if prefetched:
+                # Fetched just before waking up
+                sports_data, prefetched = prefetched, None
+            else:
+                # Fetch current scores
+                logger.info("Fetching latest scores")
+                sports_data = client.fetch_scores() if client else fetch_scores()
+
+            if sports_data:
+                watchdog.fetch_succeeded()
+                # Share the new scores with the peer boards
+                if hub:
+                    hub.publish(sports_data)
+                save_snapshot(sports_data)
+
+                # Display all scores (organized by league), a peer board
+                # starts over as soon as the hub pushes newer scores
+                retry.reset()
+                display_scores(sports_data, client.received.is_set if client else None)
+            else:
+                retry_in = retry.next_delay()
+                logger.warning(
+                    "Failed to fetch scores", extra={"retry_in": round(retry_in)}
+                )
+                watchdog.hold_frame(retry_in)
+                config_reload.wait(retry_in)
+
+        except KeyboardInterrupt:
+            logger.info("Shutting down")
+            release_backend()
+            break
+        except Exception:
+            retry_in = retry.next_delay()
+            logger.exception("Unexpected error", extra={"retry_in": round(retry_in)})
+            watchdog.hold_frame(retry_in)
+            config_reload.wait(retry_in)
@@ -1,14 +1,43 @@
 #!/usr/bin/env python3
-"""Utility functions package."""
+"""
+Utility functions package.
 
-from .image_utils import get_or_download_image
-from .matrix_utils import calculate_centered_x, initialize_matrix
-from .sleep_schedule import is_sleep_time, time_until_wake
+The helpers are imported on first use (PEP 562), so importing one utility does
+not load requests, Pillow and rgbmatrix for all of them.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .image_utils import get_or_download_image
+    from .matrix_utils import calculate_centered_x, initialize_matrix
+    from .sleep_schedule import is_sleep_time, sleep_remaining, time_until_wake
+
+# name -> submodule defining it
+_EXPORTS = {
+    "get_or_download_image": "image_utils",
+    "is_sleep_time": "sleep_schedule",
+    "time_until_wake": "sleep_schedule",
+    "sleep_remaining": "sleep_schedule",
+    "initialize_matrix": "matrix_utils",
+    "calculate_centered_x": "matrix_utils",
+}
 
 __all__ = [
     "get_or_download_image",
     "is_sleep_time",
     "time_until_wake",
+    "sleep_remaining",
     "initialize_matrix",
     "calculate_centered_x",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
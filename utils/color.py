@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Color pipeline for the panel: gamma, per-channel color correction and
+brightness, precomputed as one lookup table.
+
+The table is applied once to each sprite as it enters the sprite cache
+(Image.point runs it over all pixels in C) and to the text colors when a
+layout is built, never per frame. When a reload changes the color settings,
+the table and everything built with it (sprites, layouts) are dropped.
+"""
+
+import hashlib
+from functools import lru_cache
+
+from PIL import Image
+
+import config
+
+from . import config_reload
+
+# The settings the lookup table is built from
+COLOR_SETTINGS = frozenset({"DISPLAY_GAMMA", "COLOR_BALANCE", "SPRITE_BRIGHTNESS"})
+
+
+def build_lut(
+    gamma: float, balance: tuple[float, float, float], brightness: int
+) -> list[int]:
+    """
+    Build the RGB lookup table for Image.point.
+
+    Args:
+        gamma: Gamma exponent (1.0 leaves the levels as they are)
+        balance: Red, green and blue multipliers (color correction)
+        brightness: Overall level (percent)
+
+    Returns:
+        768 values: the red, then green, then blue table
+    """
+    lut = []
+    for channel_scale in balance:
+        scale = channel_scale * brightness / 100
+        for level in range(256):
+            value = 255 * (level / 255) ** gamma * scale
+            lut.append(min(255, max(0, round(value))))
+    return lut
+
+
+@lru_cache(maxsize=1)
+def panel_lut() -> tuple[int, ...]:
+    """The lookup table for the configured gamma, color balance and brightness."""
+    return tuple(
+        build_lut(config.DISPLAY_GAMMA, config.COLOR_BALANCE, config.SPRITE_BRIGHTNESS)
+    )
+
+
+@lru_cache(maxsize=1)
+def lut_signature() -> str:
+    """A short id of the lookup table, to key color corrected sprites with."""
+    return hashlib.md5(bytes(panel_lut())).hexdigest()[:8]
+
+
+def _is_identity(lut: tuple[int, ...]) -> bool:
+    return lut == tuple(range(256)) * 3
+
+
+def correct_image(image: Image.Image) -> Image.Image:
+    """
+    Apply the panel lookup table to an RGB image.
+
+    Args:
+        image: The RGB image
+
+    Returns:
+        A corrected copy (the image itself if the table changes nothing)
+    """
+    lut = panel_lut()
+    if _is_identity(lut):
+        return image
+    return image.point(lut)
+
+
+def correct_color(color: tuple[int, int, int]) -> tuple[int, int, int]:
+    """Apply the panel lookup table to a single RGB color."""
+    lut = panel_lut()
+    red, green, blue = color
+    return lut[red], lut[256 + green], lut[512 + blue]
+
+
+def _clear_tables(_changed: set[str]) -> None:
+    panel_lut.cache_clear()
+    lut_signature.cache_clear()
+
+
+config_reload.on_reload(COLOR_SETTINGS, _clear_tables)
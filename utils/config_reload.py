@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Hot reload of the settings, without restarting the service.
+
+A reload is requested by SIGHUP (systemctl reload) or by saving .env, and is
+applied between screens: config.py is evaluated again, with .env read under the
+environment the service was started with, the new values are validated, then
+copied into the config module. os.environ is left alone, other threads read it.
+Modules read reloadable settings as `config.NAME` when they use them, and the
+owners of derived state register for the settings it depends on:
+
+    DISPLAY_BRIGHTNESS          set on the running display
+    gamma, color balance        color table, sprite and layout caches dropped
+    panel geometry, mode        the display backend is created again
+    anything else               used from the next fetch, rotation or sleep check
+
+Settings read once at startup are left as they are until a restart.
+"""
+
+import importlib.util
+import logging
+import signal
+import socket
+import threading
+import time
+from collections.abc import Callable, Iterable
+from types import FrameType, ModuleType
+
+from dotenv import dotenv_values
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Settings taken into account at startup only
+RESTART_REQUIRED = frozenset(
+    {
+        "RUNTIME_MODE",
+        "HUB_MODE",
+        "HUB_PORT",
+        "HUB_BIND",
+        "HUB_URL",
+        "METRICS_ENABLED",
+        "METRICS_FILE",
+        "METRICS_INTERVAL",
+        "METRICS_PORT",
+        "PROFILE_CYCLES",
+        "PROFILE_DIR",
+        "PROFILE_SAMPLE_INTERVAL",
+        "PROFILE_MEMORY",
+        "LOG_FORMAT",
+        "SPRITE_ATLAS",
+        "ATLAS_DIR",
+        "ATLAS_MAX_MB",
+        "SNAPSHOT_FILE",
+        "CONFIG_WATCH_INTERVAL",
+    }
+)
+
+# How often an awaited wait checks for a requested reload (seconds)
+ASYNC_POLL_INTERVAL = 1.0
+
+
+def _positive(value: float) -> bool:
+    return value > 0
+
+
+def _not_negative(value: float) -> bool:
+    return value >= 0
+
+
+# setting -> (check, what the value must be)
+_CHECKS: dict[str, tuple[Callable[[float], bool], str]] = {
+    "SOURCE_TIMEOUT": (_positive, "positive"),
+    "FETCH_INTERVAL": (_positive, "positive"),
+    "EVENT_DISPLAY_TIME": (_positive, "positive"),
+    "LEAGUE_DISPLAY_TIME": (_not_negative, "0 or more"),
+    "CYCLE_BUDGET": (_not_negative, "0 or more"),
+    "MIN_SCREEN_TIME": (_not_negative, "0 or more"),
+    "RETRY_BASE_DELAY": (_positive, "positive"),
+    "TRY_AGAIN_INTERVAL": (_positive, "positive"),
+    "BREAKER_FAILURES": (_positive, "positive"),
+    "BREAKER_COOLDOWN": (_not_negative, "0 or more"),
+    "BADGE_NEGATIVE_TTL": (_not_negative, "0 or more"),
+    "BADGE_TIMEOUT": (_positive, "positive"),
+    "FRAME_SLO": (_not_negative, "0 or more"),
+    "FETCH_SLO": (_not_negative, "0 or more"),
+    "PREFETCH_BEFORE_WAKE": (_not_negative, "0 or more"),
+    "DISPLAY_GAMMA": (_positive, "positive"),
+    "SPRITE_BRIGHTNESS": (_not_negative, "0 or more"),
+}
+
+# (settings, callback) in registration order
+_listeners: list[tuple[frozenset[str], Callable[[set[str]], None]]] = []
+_requested = threading.Event()
+_lock = threading.Lock()
+# Signal numbers written by the interpreter when a signal arrives (reader, writer)
+_signal_pipe: tuple[socket.socket, socket.socket] | None = None
+
+
+def validate(settings: ModuleType) -> list[str]:
+    """
+    Check loaded settings for values the board cannot run with.
+
+    Args:
+        settings: A module evaluated from config.py
+
+    Returns:
+        One message per invalid setting (empty if all are valid)
+    """
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+    from .sleep_schedule import parse_military_time
+
+    errors = []
+    for name, (check, expected) in _CHECKS.items():
+        if not check(getattr(settings, name)):
+            errors.append(f"{name} must be {expected}")
+
+    for name in ("SLEEP_START_TIME", "SLEEP_END_TIME"):
+        try:
+            parse_military_time(getattr(settings, name))
+        except ValueError:
+            errors.append(f"{name} must be a time as HH:MM")
+    try:
+        ZoneInfo(settings.TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        errors.append("TIMEZONE must be a time zone name")
+
+    if settings.DISPLAY_MODE not in ("console", "matrix", "memory"):
+        errors.append("DISPLAY_MODE must be console, matrix or memory")
+    if settings.SOURCE_PRECEDENCE not in ("order", "fastest"):
+        errors.append("SOURCE_PRECEDENCE must be order or fastest")
+    # config.py already rejects anything but three values
+    if min(settings.COLOR_BALANCE) < 0:
+        errors.append("COLOR_BALANCE must be three multipliers, 0 or more")
+    if not isinstance(logging.getLevelName(settings.LOG_LEVEL), int):
+        errors.append("LOG_LEVEL must be DEBUG, INFO, WARNING or ERROR")
+
+    if not 1 <= settings.DISPLAY_BRIGHTNESS <= 100:
+        errors.append("DISPLAY_BRIGHTNESS must be between 1 and 100")
+    matrix = settings.MATRIX_CONFIG
+    for key in ("rows", "cols", "chain_length", "parallel"):
+        if matrix[key] <= 0:
+            errors.append(f"MATRIX_{key.upper()} must be positive")
+    return errors
+
+
+def on_reload(settings: Iterable[str], callback: Callable[[set[str]], None]) -> None:
+    """
+    Call back after a reload that changed any of the settings.
+
+    Args:
+        settings: The setting names the caller depends on
+        callback: Called with the names of those that changed
+    """
+    _listeners.append((frozenset(settings), callback))
+
+
+def _load_settings(env: dict[str, str]) -> ModuleType:
+    """Evaluate config.py again, as a new module reading the settings from env."""
+    spec = importlib.util.spec_from_file_location("config", config.__file__)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {config.__file__}")
+    settings = importlib.util.module_from_spec(spec)
+    vars(settings)["_env"] = env
+    spec.loader.exec_module(settings)
+    return settings
+
+
+def reload() -> set[str]:
+    """
+    Read the settings again and apply the ones that changed. Nothing is applied
+    if any setting is invalid.
+
+    Returns:
+        The names of the settings applied
+    """
+    with _lock:
+        try:
+            # .env under the start environment, as at startup, so settings
+            # removed from it fall back to their defaults
+            env = {
+                name: value
+                for name, value in dotenv_values(config.ENV_FILE).items()
+                if value is not None
+            }
+            env.update(config.BASE_ENV)
+            settings = _load_settings(env)
+            errors = validate(settings)
+        except (ValueError, OSError, ImportError) as e:
+            errors = [str(e)]
+        if errors:
+            logger.error("Configuration not reloaded", extra={"errors": errors})
+            return set()
+
+        changed = {
+            name
+            for name, value in vars(settings).items()
+            if name.isupper() and getattr(config, name, None) != value
+        }
+        pending_restart = changed & RESTART_REQUIRED
+        if pending_restart:
+            logger.warning(
+                "Settings need a restart to apply",
+                extra={"settings": sorted(pending_restart)},
+            )
+        changed -= RESTART_REQUIRED
+        for name in changed:
+            setattr(config, name, getattr(settings, name))
+
+        if not changed:
+            logger.info("Configuration reloaded, no changes")
+            return changed
+        logger.info("Configuration reloaded", extra={"changed": sorted(changed)})
+        for names, callback in _listeners:
+            affected = changed & names
+            if affected:
+                try:
+                    callback(affected)
+                except Exception:
+                    logger.exception(
+                        "Error applying settings", extra={"settings": sorted(affected)}
+                    )
+        return changed
+
+
+def request_reload() -> None:
+    """Ask for a reload at the next wait(). Not to be called from a signal handler."""
+    _requested.set()
+
+
+def _on_sighup(_signum: int, _frame: FrameType | None) -> None:
+    """
+    SIGHUP handler. It runs on the main thread, possibly inside wait() holding
+    the Event's lock, so the request is made by _relay_signals instead.
+    """
+
+
+def apply_pending() -> bool:
+    """
+    Reload now if a reload was requested.
+
+    Returns:
+        True if settings changed
+    """
+    if not _requested.is_set():
+        return False
+    _requested.clear()
+    return bool(reload())
+
+
+def wait(seconds: float | Callable[[], float]) -> None:
+    """
+    time.sleep() that applies reloads requested in the meantime.
+
+    Args:
+        seconds: How long to wait, or a function giving it, which is called
+            again after a reload (for waits derived from the settings)
+    """
+    duration = seconds() if callable(seconds) else seconds
+    deadline = time.monotonic() + duration
+    while (remaining := deadline - time.monotonic()) > 0:
+        if not _requested.wait(remaining):
+            return
+        if apply_pending() and callable(seconds):
+            deadline = time.monotonic() + seconds()
+
+
+async def wait_async(seconds: float | Callable[[], float]) -> None:
+    """
+    asyncio.sleep() that applies reloads requested in the meantime.
+
+    Args:
+        seconds: How long to wait, or a function giving it, which is called
+            again after a reload (for waits derived from the settings)
+    """
+    # Imported here, the sync runtime runs without loading asyncio
+    import asyncio
+
+    duration = seconds() if callable(seconds) else seconds
+    deadline = time.monotonic() + duration
+    while (remaining := deadline - time.monotonic()) > 0:
+        await asyncio.sleep(min(remaining, ASYNC_POLL_INTERVAL))
+        if apply_pending() and callable(seconds):
+            deadline = time.monotonic() + seconds()
+
+
+def _env_mtime() -> int | None:
+    try:
+        return config.ENV_FILE.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _watch_env_file() -> None:
+    mtime = _env_mtime()
+    while True:
+        time.sleep(config.CONFIG_WATCH_INTERVAL)
+        current = _env_mtime()
+        if current != mtime:
+            mtime = current
+            logger.info("Settings file changed", extra={"path": config.ENV_FILE})
+            request_reload()
+
+
+def _relay_signals(reader: socket.socket) -> None:
+    """Request a reload for each SIGHUP written to the wakeup fd."""
+    while True:
+        if signal.SIGHUP in reader.recv(64):
+            request_reload()
+
+
+def start_config_watch() -> None:
+    """
+    Reload on SIGHUP and when .env changes. Must be called from the main thread
+    (signal handlers are installed there).
+
+    The async runtime replaces the SIGHUP handling with loop.add_signal_handler().
+    """
+    global _signal_pipe
+    reader, writer = socket.socketpair()
+    writer.setblocking(False)
+    _signal_pipe = (reader, writer)
+    signal.set_wakeup_fd(writer.fileno(), warn_on_full_buffer=False)
+    signal.signal(signal.SIGHUP, _on_sighup)
+    threading.Thread(
+        target=_relay_signals, args=(reader,), name="signal-relay", daemon=True
+    ).start()
+    if config.CONFIG_WATCH_INTERVAL > 0:
+        threading.Thread(
+            target=_watch_env_file, name="config-watch", daemon=True
+        ).start()
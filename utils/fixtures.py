@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Record API responses and badge downloads into a fixture bundle, and replay
+them from a local stand-in server.
+
+Record (one fetch of every configured source and badge):
+    python3 -m api.sports_api --record fixtures/weekend
+
+Replay:
+    python3 -m utils.fixtures fixtures/weekend --latency 0.2 --error-rate 0.1
+    API_URL=http://127.0.0.1:8780/scores python3 -m display.matrix_display
+
+Replayed scores also speak the delta protocol of api.score_feed (?since= and
+/stream). With --score-interval a score goes up every so many seconds, to see
+deltas and pushed updates arrive:
+    python3 -m utils.fixtures fixtures/weekend --score-interval 20
+    API_STREAM=true API_URL=http://127.0.0.1:8780/scores python3 main.py
+
+A bundle is a directory with a manifest.json and one body file per URL.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+# Seconds between keep-alive comments on an idle stream
+STREAM_KEEPALIVE = 15
+# The delta protocol headers, as in api.score_feed
+CURSOR_HEADER = "X-Scores-Cursor"
+DELTA_HEADER = "X-Scores-Delta"
+
+
+class FixtureRecorder:
+    """Saves responses into a bundle directory."""
+
+    def __init__(self, bundle_dir: Path) -> None:
+        self.bundle_dir = bundle_dir
+        self.manifest: dict[str, dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        (bundle_dir / "bodies").mkdir(parents=True, exist_ok=True)
+
+    def save(self, url: str, kind: str, content_type: str, body: bytes) -> None:
+        filename = f"bodies/{hashlib.md5(url.encode()).hexdigest()}.bin"
+        (self.bundle_dir / filename).write_bytes(body)
+        with self.lock:
+            self.manifest[url] = {
+                "kind": kind,
+                "file": filename,
+                "content_type": content_type,
+            }
+            manifest = json.dumps(self.manifest, indent=2)
+        (self.bundle_dir / MANIFEST).write_text(manifest)
+
+
+_recorder: FixtureRecorder | None = None
+
+
+def start_recording(bundle_dir: Path) -> None:
+    """Record every score and badge response from now on into bundle_dir."""
+    global _recorder
+    _recorder = FixtureRecorder(bundle_dir)
+    logger.info("Recording fixtures", extra={"path": bundle_dir})
+
+
+def is_recording() -> bool:
+    """Whether responses are being recorded (their bodies are read up front)."""
+    return _recorder is not None
+
+
+def record_response(url: str, response: Any, kind: str) -> None:
+    """
+    Save a requests response to the bundle when recording (no-op otherwise).
+    Reads the whole body, iter_content() then replays it from memory.
+
+    Args:
+        url: The requested URL
+        response: The requests.Response
+        kind: "scores" or "badge"
+    """
+    if _recorder is None:
+        return
+    content_type = response.headers.get("Content-Type", "application/octet-stream")
+    _recorder.save(url, kind, content_type, response.content)
+
+
+def record_file(url: str, filepath: Path) -> None:
+    """Save an already cached badge to the bundle when recording (no-op otherwise)."""
+    if _recorder is None:
+        return
+    _recorder.save(url, "badge", "application/octet-stream", filepath.read_bytes())
+
+
+class ScoreTimeline:
+    """
+    A recorded scores payload that changes over time: every `interval`
+    seconds (0 for never) a game scores. Each change is a new version, the
+    versions are the cursors of the delta and stream endpoints.
+    """
+
+    def __init__(self, body: bytes, interval: float = 0.0) -> None:
+        self.payload = json.loads(body)
+        self.events: list[dict[str, Any]] = self.payload.get("events", [])
+        self.version = 1
+        # event id -> version it last changed in
+        self.changed_in = {self._id(index): 1 for index in range(len(self.events))}
+        self.condition = threading.Condition()
+        if interval > 0:
+            threading.Thread(
+                target=self._play, args=(interval,), name="score-timeline", daemon=True
+            ).start()
+
+    def _id(self, index: int) -> str:
+        return str(self.events[index].get("id") or index)
+
+    def _play(self, interval: float) -> None:
+        while True:
+            time.sleep(interval)
+            self.score()
+
+    def score(self) -> None:
+        """A game in progress (any game if none is) scores a point."""
+        live = [
+            index
+            for index, event in enumerate(self.events)
+            if event.get("status_type") == "STATUS_IN_PROGRESS"
+        ]
+        candidates = live or list(range(len(self.events)))
+        if not candidates:
+            return
+        index = random.choice(candidates)
+        team = self.events[index][random.choice(("team_one", "team_two"))]
+        with self.condition:
+            team["score"] = int(team.get("score") or 0) + 1
+            self.version += 1
+            self.changed_in[self._id(index)] = self.version
+            self.condition.notify_all()
+        logger.info(
+            "Replayed score change",
+            extra={"event": self._id(index), "version": self.version},
+        )
+
+    def full(self) -> tuple[int, bytes]:
+        """The current version and all events."""
+        with self.condition:
+            return self.version, json.dumps(self.payload).encode()
+
+    def delta(self, cursor: str) -> tuple[int, bytes] | None:
+        """
+        The current version and the events changed since a cursor.
+
+        Returns:
+            None if the cursor is not a version of this timeline
+        """
+        with self.condition:
+            if not cursor.isdigit() or not 1 <= int(cursor) <= self.version:
+                return None
+            since = int(cursor)
+            changed = [
+                event
+                for index, event in enumerate(self.events)
+                if self.changed_in[self._id(index)] > since
+            ]
+            body = json.dumps({"events": changed, "deleted": []}).encode()
+            return self.version, body
+
+    def wait_for_change(self, version: int, timeout: float) -> bool:
+        """Wait until a version newer than `version` exists."""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.version > version, timeout)
+
+
+class ReplayServer:
+    """Serves a fixture bundle with configurable latency and injected failures."""
+
+    def __init__(
+        self,
+        bundle_dir: Path,
+        port: int,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        stall_rate: float = 0.0,
+        score_interval: float = 0.0,
+    ) -> None:
+        self.bundle_dir = bundle_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.base_url = f"http://127.0.0.1:{port}"
+
+        manifest = json.loads((bundle_dir / MANIFEST).read_text())
+        # path -> (content type, body)
+        self.routes: dict[str, tuple[str, bytes]] = {}
+        # scores path -> its changing events
+        self.timelines: dict[str, ScoreTimeline] = {}
+        local_urls = {}
+        for index, (url, entry) in enumerate(manifest.items()):
+            if entry["kind"] == "badge":
+                local_urls[url] = f"{self.base_url}/badge/{index}"
+
+        scores = 0
+        for url, entry in manifest.items():
+            body = (bundle_dir / entry["file"]).read_bytes()
+            if entry["kind"] == "scores":
+                body = self._rewrite_urls(body, local_urls)
+                path = "/scores" if scores == 0 else f"/scores/{scores}"
+                self.routes[path] = (entry["content_type"], body)
+                self.timelines[path] = ScoreTimeline(body, score_interval)
+                scores += 1
+            else:
+                path = local_urls[url].removeprefix(self.base_url)
+                self.routes[path] = (entry["content_type"], body)
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                server._handle(self)
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                logger.debug("Replay request", extra={"request": format % args})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+
+    @staticmethod
+    def _rewrite_urls(body: bytes, local_urls: dict[str, str]) -> bytes:
+        """Point the badge URLs of a scores payload at this server."""
+        text = body.decode()
+        for url, local in local_urls.items():
+            text = text.replace(url, local)
+            # JSON encoders may escape slashes
+            text = text.replace(url.replace("/", "\\/"), local)
+        return text.encode()
+
+    def serve_forever(self) -> None:
+        logger.info(
+            "Replaying fixtures",
+            extra={"url": f"{self.base_url}/scores", "routes": len(self.routes)},
+        )
+        self.server.serve_forever()
+
+    def _handle(self, request: BaseHTTPRequestHandler) -> None:
+        path, _, query = request.path.partition("?")
+        stream = self.timelines.get(path.removesuffix("/stream"))
+        if path.endswith("/stream") and stream is not None:
+            self._stream(request, stream)
+            return
+        route = self.routes.get(path)
+        if route is None:
+            request.send_error(404)
+            return
+
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+        if random.random() < self.stall_rate:
+            # Longer than any client timeout
+            time.sleep(60)
+        if random.random() < self.error_rate:
+            request.send_error(503, "Injected error")
+            return
+
+        content_type, body = route
+        headers = {}
+        timeline = self.timelines.get(path)
+        if timeline is not None:
+            since = parse_qs(query).get("since")
+            delta = timeline.delta(since[0]) if since else None
+            if since and delta is None:
+                request.send_error(410, "Unknown cursor")
+                return
+            version, body = delta or timeline.full()
+            headers[CURSOR_HEADER] = str(version)
+            if delta:
+                headers[DELTA_HEADER] = "1"
+
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            request.send_response(304)
+            request.send_header("ETag", etag)
+            request.end_headers()
+            return
+
+        request.send_response(200)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        request.send_header("ETag", etag)
+        for name, value in headers.items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(body)
+
+    def _stream(self, request: BaseHTTPRequestHandler, timeline: ScoreTimeline) -> None:
+        """Push the changes of a timeline as Server-Sent Events."""
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+        if random.random() < self.error_rate:
+            request.send_error(503, "Injected error")
+            return
+
+        request.send_response(200)
+        request.send_header("Content-Type", "text/event-stream")
+        request.send_header("Cache-Control", "no-cache")
+        request.end_headers()
+
+        # Resume from the client's cursor, or start with all events
+        last_id = request.headers.get("Last-Event-ID") or ""
+        first = timeline.delta(last_id) if last_id else None
+        if first is None:
+            version, body = timeline.full()
+            kind = "scores"
+        else:
+            version, body = first
+            kind = "delta"
+        try:
+            self._send_event(request, kind, version, body)
+            while True:
+                if not timeline.wait_for_change(version, STREAM_KEEPALIVE):
+                    request.wfile.write(b": keep-alive\n\n")
+                    request.wfile.flush()
+                    continue
+                delta = timeline.delta(str(version))
+                if delta is not None:
+                    version, body = delta
+                    self._send_event(request, "delta", version, body)
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    @staticmethod
+    def _send_event(
+        request: BaseHTTPRequestHandler, kind: str, version: int, body: bytes
+    ) -> None:
+        request.wfile.write(
+            f"event: {kind}\nid: {version}\ndata: ".encode() + body + b"\n\n"
+        )
+        request.wfile.flush()
+
+
+if __name__ == "__main__":
+    from utils.logging_setup import setup_logging
+
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Serve a recorded fixture bundle")
+    parser.add_argument("bundle", type=Path, help="Bundle directory")
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds")
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Extra random seconds"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of requests given a 503"
+    )
+    parser.add_argument(
+        "--stall-rate", type=float, default=0.0, help="Share of requests that hang"
+    )
+    parser.add_argument(
+        "--score-interval",
+        type=float,
+        default=0.0,
+        help="Seconds between replayed score changes (0 for none)",
+    )
+    args = parser.parse_args()
+
+    ReplayServer(
+        args.bundle,
+        args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        stall_rate=args.stall_rate,
+        score_interval=args.score_interval,
+    ).serve_forever()
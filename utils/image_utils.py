@@ -2,11 +2,73 @@
 """Utility functions for downloading and caching images."""
 
 import hashlib
+import logging
+import os
+import time
 from pathlib import Path
 
 import requests
 from PIL import Image
 
+import config
+
+from . import fixtures, metrics, resilience
+
+logger = logging.getLogger(__name__)
+
+
+def image_cache_path(url: str, save_dir: Path) -> Path:
+    """
+    Build the local cache path for an image URL.
+    Uses URL hash as filename to avoid duplicates.
+
+    Args:
+        url: The URL of the image
+        save_dir: Directory the image is cached in
+
+    Returns:
+        Path the image is (or will be) stored at
+    """
+    # Create filename from URL hash + extension
+    url_hash = hashlib.md5(url.encode()).hexdigest()
+    # Called for every badge lookup, skip building the record unless wanted
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Getting image", extra={"url": url, "hash": url_hash})
+    extension = url.split(".")[-1].split("?")[0]  # Handle query params
+    if extension not in ["png", "jpg", "jpeg", "gif", "bmp"]:
+        extension = "png"  # Default extension
+
+    return save_dir / f"{url_hash}.{extension}"
+
+
+def flatten_image(filepath: Path) -> None:
+    """
+    Composite a downloaded image with transparency onto a white background.
+    Saves the result as RGB in place.
+
+    Args:
+        filepath: Path of the downloaded image
+    """
+    try:
+        with Image.open(filepath) as img:
+            has_alpha = img.mode in ("RGBA", "LA") or ("transparency" in img.info)
+            if has_alpha:
+                bg = Image.new("RGB", img.size, (255, 255, 255))
+                if img.mode in ("RGBA", "LA"):
+                    bg.paste(img, mask=img.split()[-1])
+                else:
+                    bg.paste(img)
+                bg.save(filepath)
+            else:
+                # Ensure saved image is RGB (no alpha channel lingering)
+                if img.mode != "RGB":
+                    img.convert("RGB").save(filepath)
+    except Exception as e:
+        logger.warning("Error processing image", extra={"path": filepath, "error": e})
+        # If Pillow can't process it for any reason,
+        # leave the raw file as downloaded
+        pass
+
 
 def get_or_download_image(url: str, save_dir: Path) -> Path | None:
     """
@@ -27,51 +89,69 @@ def get_or_download_image(url: str, save_dir: Path) -> Path | None:
     # Create directory if it doesn't exist
     save_dir.mkdir(parents=True, exist_ok=True)
 
-    # Create filename from URL hash + extension
-    print(f"Getting image: {url}")
-    url_hash = hashlib.md5(url.encode()).hexdigest()
-    print(f"hash: {url_hash}")
-    extension = url.split(".")[-1].split("?")[0]  # Handle query params
-    if extension not in ["png", "jpg", "jpeg", "gif", "bmp"]:
-        extension = "png"  # Default extension
-
-    filepath = save_dir / f"{url_hash}.{extension}"
+    filepath = image_cache_path(url, save_dir)
 
     # Return existing file if already downloaded
     if filepath.exists():
+        metrics.BADGE_LOOKUPS.inc(result="hit")
+        fixtures.record_file(url, filepath)
         return filepath
 
-    # Download the image
+    # Don't retry a badge that just failed, or a host that keeps failing
+    breaker = resilience.breaker_for(url)
+    if resilience.failed_badges.is_blocked(url) or not breaker.allow():
+        metrics.BADGE_LOOKUPS.inc(result="skipped")
+        return None
+
+    # Download the image. The request timeout applies to each connect and read,
+    # the deadline to the whole download, redirects included (a server sending
+    # a byte now and then never trips the read timeout)
+    deadline = time.monotonic() + config.BADGE_TIMEOUT
+    # Written next to the cache file, so a failed download is never cached
+    partial = filepath.with_name(filepath.name + ".part")
     try:
-        response = requests.get(url, timeout=10, stream=True)
-        response.raise_for_status()
+        with requests.get(url, timeout=config.BADGE_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            fixtures.record_response(url, response, "badge")
 
-        with open(filepath, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+            if fixtures.is_recording():
+                # Already read by the recorder, replayed from memory
+                chunks = response.iter_content(chunk_size=8192)
+            else:
+                # read1() returns what has arrived, iter_content() would wait
+                # for a full chunk before the deadline is checked
+                raw = response.raw
+                chunks = iter(lambda: raw.read1(8192, decode_content=True), b"")
+            with open(partial, "wb") as f:
+                for chunk in chunks:
+                    if time.monotonic() > deadline:
+                        raise requests.Timeout(f"Took over {config.BADGE_TIMEOUT}s")
+                    f.write(chunk)
+        os.replace(partial, filepath)
+        breaker.record_success()
 
         # If the downloaded image has transparency, composite it onto a white background
-        try:
-            with Image.open(filepath) as img:
-                has_alpha = img.mode in ("RGBA", "LA") or ("transparency" in img.info)
-                if has_alpha:
-                    bg = Image.new("RGB", img.size, (255, 255, 255))
-                    if img.mode in ("RGBA", "LA"):
-                        bg.paste(img, mask=img.split()[-1])
-                    else:
-                        bg.paste(img)
-                    bg.save(filepath)
-                else:
-                    # Ensure saved image is RGB (no alpha channel lingering)
-                    if img.mode != "RGB":
-                        img.convert("RGB").save(filepath)
-        except Exception as e:
-            print(f"Error processing image {filepath}: {e}")
-            # If Pillow can't process it for any reason,
-            # leave the raw file as downloaded
-            pass
+        flatten_image(filepath)
 
+        metrics.BADGE_LOOKUPS.inc(result="miss")
         return filepath
 
+    except requests.HTTPError as e:
+        # The host answered, only this badge is missing or broken
+        breaker.record_success()
+        status = e.response.status_code if e.response is not None else None
+        resilience.failed_badges.add(url, missing=status in (404, 410))
+        metrics.BADGE_LOOKUPS.inc(result="error")
+        logger.error("Error downloading image", extra={"url": url, "error": e})
+        return None
+
     except (requests.RequestException, OSError) as e:
-        print(f"Error downloading or saving image from {url} to {filepath}: {e}")
+        partial.unlink(missing_ok=True)
+        if isinstance(e, requests.RequestException):
+            breaker.record_failure()
+            resilience.failed_badges.add(url)
+        metrics.BADGE_LOOKUPS.inc(result="error")
+        logger.error(
+            "Error downloading or saving image",
+            extra={"url": url, "path": filepath, "error": e},
+        )
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Leveled, structured logging with the output written from a background thread.
+
+Use a module logger and pass structured fields through `extra`:
+
+    logger = logging.getLogger(__name__)
+    logger.info("Fetched scores", extra={"events": 12, "seconds": 0.4})
+
+which is written as `... INFO api.sports_api: Fetched scores events=12 seconds=0.4`
+(or as one JSON object per line with LOG_FORMAT=json).
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+import config
+from config import LOG_FORMAT
+
+from . import config_reload
+
+# Attributes every LogRecord has, anything else was passed in `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _fields(record: logging.LogRecord) -> dict[str, object]:
+    return {
+        key: value
+        for key, value in vars(record).items()
+        if key not in _RECORD_ATTRIBUTES
+    }
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats the message followed by its structured fields as key=value."""
+
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = _fields(record)
+        if fields:
+            text += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as a single JSON object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **_fields(record),
+        }
+        return json.dumps(entry, default=str)
+
+
+def setup_logging() -> None:
+    """
+    Route all logging through a queue so the calling thread never waits on
+    stdout/journald. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(
+        JsonFormatter() if LOG_FORMAT == "json" else StructuredFormatter()
+    )
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(config.LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+    # Flush whatever is still queued on exit
+    atexit.register(_listener.stop)
+
+
+def _apply_log_level(_changed: set[str]) -> None:
+    logging.getLogger().setLevel(config.LOG_LEVEL)
+
+
+config_reload.on_reload({"LOG_LEVEL"}, _apply_log_level)
@@ -48,25 +48,25 @@ except ImportError:
                 pass
 
 
-from config import DEFAULT_FONT, MATRIX_CONFIG
+import config
 
 
 def initialize_matrix() -> tuple[Any, Any]:
     """Initialize the RGB matrix and load font."""
     options = RGBMatrixOptions()
-    options.brightness = MATRIX_CONFIG["brightness"]
-    options.rows = MATRIX_CONFIG["rows"]
-    options.cols = MATRIX_CONFIG["cols"]
-    options.chain_length = MATRIX_CONFIG["chain_length"]
-    options.parallel = MATRIX_CONFIG["parallel"]
-    options.hardware_mapping = MATRIX_CONFIG["hardware_mapping"]
-    options.gpio_slowdown = MATRIX_CONFIG["gpio_slowdown"]
+    options.brightness = config.MATRIX_CONFIG["brightness"]
+    options.rows = config.MATRIX_CONFIG["rows"]
+    options.cols = config.MATRIX_CONFIG["cols"]
+    options.chain_length = config.MATRIX_CONFIG["chain_length"]
+    options.parallel = config.MATRIX_CONFIG["parallel"]
+    options.hardware_mapping = config.MATRIX_CONFIG["hardware_mapping"]
+    options.gpio_slowdown = config.MATRIX_CONFIG["gpio_slowdown"]
 
     matrix = RGBMatrix(options=options)
 
     # Load font
     font = graphics.Font()
-    font.LoadFont(str(DEFAULT_FONT))
+    font.LoadFont(str(config.DEFAULT_FONT))
 
     return matrix, font
 
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Counters and histograms for the hot paths, exported in the Prometheus text format.
+
+Disabled unless METRICS_ENABLED=true, in which case every call returns early
+(timers are a shared no-op context manager).
+"""
+
+import contextlib
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from config import METRICS_ENABLED, METRICS_FILE, METRICS_INTERVAL, METRICS_PORT
+
+logger = logging.getLogger(__name__)
+
+# Default histogram buckets (seconds), from fast renders to slow fetches
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL_TIMER = contextlib.nullcontext()
+_registry: list["Counter | Histogram"] = []
+
+
+class Counter:
+    """A monotonically increasing count, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.values: dict[tuple[str, ...], float] = {}
+        self.lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = tuple(labels[label] for label in self.labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> Iterator[str]:
+        with self.lock:
+            values = dict(self.values)
+        for key, value in values.items():
+            yield f"{self.name}{_format_labels(self.labels, key)} {value:g}"
+
+
+class Histogram:
+    """Distribution of durations (seconds), optionally split by labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [count per bucket..., +Inf count, sum]
+        self.values: dict[tuple[str, ...], list[float]] = {}
+        self.lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = tuple(labels[label] for label in self.labels)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                counts = self.values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-2] += 1
+            counts[-1] += value
+
+    def time(self, **labels: str) -> contextlib.AbstractContextManager[Any]:
+        """Time a block of code: `with FETCH_SECONDS.time(): ...`"""
+        if not METRICS_ENABLED:
+            return _NULL_TIMER
+        return self._timer(labels)
+
+    @contextlib.contextmanager
+    def _timer(self, labels: dict[str, str]) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> Iterator[str]:
+        with self.lock:
+            values = {key: list(counts) for key, counts in self.values.items()}
+        for key, counts in values.items():
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, counts, strict=False):
+                cumulative += count
+                labels = _format_labels((*self.labels, "le"), (*key, f"{bound:g}"))
+                yield f"{self.name}_bucket{labels} {cumulative:g}"
+            cumulative += counts[-2]
+            labels = _format_labels((*self.labels, "le"), (*key, "+Inf"))
+            yield f"{self.name}_bucket{labels} {cumulative:g}"
+            labels = _format_labels(self.labels, key)
+            yield f"{self.name}_sum{labels} {counts[-1]:g}"
+            yield f"{self.name}_count{labels} {cumulative:g}"
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{value}"' for name, value in zip(names, values, strict=True)
+    )
+    return "{" + pairs + "}"
+
+
+# Fetch pipeline
+FETCH_SECONDS = Histogram("sports_fetch_seconds", "Time to fetch and parse all scores")
+FETCH_TOTAL = Counter("sports_fetch_total", "Score fetches by result", ("result",))
+SCORE_UPDATES = Counter(
+    "sports_score_updates_total",
+    "Score updates applied by kind (full, delta or push)",
+    ("kind",),
+)
+PARSE_SECONDS = Histogram(
+    "sports_parse_seconds", "Time to parse the events of one source"
+)
+BADGE_LOOKUPS = Counter(
+    "sports_badge_lookups_total", "Badge cache lookups by result", ("result",)
+)
+
+# Display
+RENDER_SECONDS = Histogram(
+    "sports_render_seconds", "Time to draw a screen", ("screen",)
+)
+SWAP_SECONDS = Histogram("sports_swap_seconds", "Time spent in SwapOnVSync")
+
+# Sleep schedule
+SLEEP_CHECK_SECONDS = Histogram(
+    "sports_sleep_check_seconds", "Time to evaluate the sleep schedule"
+)
+SLEEP_PERIODS = Counter("sports_sleep_periods_total", "Times the display went to sleep")
+
+# Watchdog
+WATCHDOG_STALLS = Counter(
+    "sports_watchdog_stalls_total",
+    "Stalls detected by kind (frame or fetch)",
+    ("kind",),
+)
+
+
+def render_metrics() -> str:
+    """Render every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _write_metrics_file() -> None:
+    """Rewrite METRICS_FILE periodically, e.g. for node_exporter textfile collection."""
+    tmp_path = f"{METRICS_FILE}.tmp"
+    while True:
+        time.sleep(METRICS_INTERVAL)
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(render_metrics())
+            # Atomic swap so readers never see a half written file
+            os.replace(tmp_path, METRICS_FILE)
+        except OSError as e:
+            logger.error(
+                "Error writing metrics", extra={"path": METRICS_FILE, "error": e}
+            )
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        # Scrapes are frequent, keep the journal quiet
+        pass
+
+
+def start_metrics_exporter() -> None:
+    """Start the configured exporters (METRICS_FILE and/or METRICS_PORT)."""
+    if not METRICS_ENABLED:
+        return
+
+    if METRICS_FILE:
+        threading.Thread(
+            target=_write_metrics_file, name="metrics-file", daemon=True
+        ).start()
+        logger.info(
+            "Writing metrics file",
+            extra={"path": METRICS_FILE, "interval": METRICS_INTERVAL},
+        )
+
+    if METRICS_PORT:
+        server = ThreadingHTTPServer(("", METRICS_PORT), _MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(
+            target=server.serve_forever, name="metrics-http", daemon=True
+        ).start()
+        logger.info("Serving metrics at /metrics", extra={"port": METRICS_PORT})
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+CPU and memory profiling of the display cycle.
+
+A CPU pass and a memory pass are run separately, since tracing every
+allocation slows the code down far more than cProfile does.
+
+The CPU pass writes to the output directory:
+    profile.pstats        cProfile data of the main thread and of the calls
+                          made through @profile_in_thread on other threads (the
+                          source fetches), merged (open with `python -m pstats`
+                          or snakeviz)
+    profile.txt           the time spent parsing, then the top functions by
+                          cumulative time
+    stacks.folded         sampled stacks of every thread, fetch pool included,
+                          one "thread;frame;frame count" per line
+                          (flamegraph.pl, speedscope, inferno...)
+The memory pass writes:
+    memory-<n>-<stage>.snapshot / .txt
+                          tracemalloc snapshot after each stage, and the lines
+                          that allocated the most during that stage
+"""
+
+import contextlib
+import cProfile
+import functools
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from types import FrameType
+from typing import ParamSpec, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Frames kept per tracemalloc allocation
+TRACEMALLOC_FRAMES = 25
+# Where the score parsing happens, reported as its own stage (file, function)
+PARSE_FUNCTIONS = (
+    ("sports_api.py", "parse_events"),
+    ("sports_api.py", "parse_changes"),
+    ("sports_api.py", "iter_events"),
+)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# The profiler of the CPU pass in progress, if any
+_active: "Profiler | None" = None
+
+
+def profile_in_thread(func: Callable[P, R]) -> Callable[P, R]:
+    """
+    Profile the calls of a function that runs on worker threads, which
+    cProfile does not follow, while a CPU pass is in progress.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        profiler = _active
+        if profiler is None or threading.get_ident() == profiler.target_thread:
+            return func(*args, **kwargs)
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            profiler.add_profile(profile)
+
+    return wrapper
+
+
+class Profiler:
+    """
+    Profiles the display cycles run between start() and stop(), either CPU
+    time (cProfile and stack samples) or memory (tracemalloc).
+    """
+
+    def __init__(self, out_dir: Path, sample_interval: float, memory: bool) -> None:
+        self.out_dir = out_dir
+        self.sample_interval = sample_interval
+        self.memory = memory
+        self.profile = cProfile.Profile()
+        self.stacks: Counter[str] = Counter()
+        self.cycle = 0
+        # Profiles of calls made on other threads, merged when written
+        self.thread_profiles: list[cProfile.Profile] = []
+        self.lock = threading.Lock()
+        self.target_thread = threading.get_ident()
+        self.stopped = threading.Event()
+        self.sampler = threading.Thread(
+            target=self._sample, name="stack-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        global _active
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        if self.memory:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            return
+        self.sampler.start()
+        _active = self
+        self.profile.enable()
+
+    def stop(self) -> None:
+        global _active
+        if self.memory:
+            tracemalloc.stop()
+            return
+        self.profile.disable()
+        _active = None
+        self.stopped.set()
+        self.sampler.join()
+        self._write_results()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time one stage of the current cycle, or record the memory it allocated."""
+        if self.memory:
+            before = self._snapshot()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if self.memory:
+                _current, peak = tracemalloc.get_traced_memory()
+                self._write_snapshot(name, before, self._snapshot())
+                logger.info(
+                    "Profiled stage memory",
+                    extra={
+                        "cycle": self.cycle,
+                        "stage": name,
+                        "peak_kib": peak // 1024,
+                    },
+                )
+            else:
+                logger.info(
+                    "Profiled stage",
+                    extra={
+                        "cycle": self.cycle,
+                        "stage": name,
+                        "seconds": round(elapsed, 3),
+                    },
+                )
+
+    def add_profile(self, profile: cProfile.Profile) -> None:
+        """Add the profile of a call made on another thread."""
+        with self.lock:
+            self.thread_profiles.append(profile)
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+
+    def _sample(self) -> None:
+        """Collect the stack of every other thread every sample_interval seconds."""
+        own = threading.get_ident()
+        while not self.stopped.wait(self.sample_interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, top in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                frame: FrameType | None = top
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(str(names.get(ident, ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def _write_snapshot(
+        self, stage: str, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot
+    ) -> None:
+        base = self.out_dir / f"memory-{self.cycle}-{stage}"
+        after.dump(str(base.with_suffix(".snapshot")))
+        with open(base.with_suffix(".txt"), "w") as f:
+            for stat in after.compare_to(before, "lineno")[:25]:
+                f.write(f"{stat}\n")
+
+    def _write_results(self) -> None:
+        summary = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=summary)
+        with self.lock:
+            for profile in self.thread_profiles:
+                stats.add(profile)
+        stats.dump_stats(self.out_dir / "profile.pstats")
+
+        parse_seconds = _parse_seconds(stats)
+        cycles = self.cycle + 1
+        summary.write(
+            f"parse: {parse_seconds:.3f}s over {cycles} cycles "
+            f"({parse_seconds / cycles:.3f}s per cycle, with the download when "
+            f"STREAM_PARSE is on)\n"
+        )
+        stats.sort_stats("cumulative").print_stats(40)
+        (self.out_dir / "profile.txt").write_text(summary.getvalue())
+        logger.info(
+            "Profiled stage",
+            extra={
+                "cycles": cycles,
+                "stage": "parse",
+                "seconds": round(parse_seconds, 3),
+            },
+        )
+
+        with open(self.out_dir / "stacks.folded", "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        logger.info("Profile written", extra={"path": self.out_dir})
+
+
+def _parse_seconds(stats: pstats.Stats) -> float:
+    """Cumulative time of the PARSE_FUNCTIONS (they do not call each other)."""
+    total = 0.0
+    # (file, line, function) -> (calls, primitive calls, total, cumulative, callers)
+    for (filename, _line, function), entry in stats.stats.items():  # type: ignore[attr-defined]
+        if (Path(filename).name, function) in PARSE_FUNCTIONS:
+            total += entry[3]
+    return total
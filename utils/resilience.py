@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Shared resilience helpers for the score fetch and badge downloads:
+per-host circuit breakers, exponential backoff with jitter and a negative
+cache of badge URLs that keep failing.
+"""
+
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Exponential backoff with jitter ("equal jitter").
+
+    Args:
+        attempt: Number of consecutive failures so far (1 for the first)
+        base: Delay after the first failure (seconds)
+        cap: Maximum delay (seconds)
+
+    Returns:
+        Seconds to wait, between half and all of base * 2^(attempt - 1)
+    """
+    delay = float(min(cap, base * 2 ** max(attempt - 1, 0)))
+    # The random half spreads boards apart so they do not retry in lockstep
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class Backoff:
+    """
+    Tracks consecutive failures of a retry loop. The delays default to
+    RETRY_BASE_DELAY and TRY_AGAIN_INTERVAL, read at each retry.
+    """
+
+    def __init__(self, base: float | None = None, cap: float | None = None):
+        self.base = base
+        self.cap = cap
+        self.failures = 0
+
+    def next_delay(self) -> float:
+        """Record a failure and return how long to wait before retrying."""
+        self.failures += 1
+        base = config.RETRY_BASE_DELAY if self.base is None else self.base
+        cap = config.TRY_AGAIN_INTERVAL if self.cap is None else self.cap
+        return backoff_delay(self.failures, base, cap)
+
+    def reset(self) -> None:
+        self.failures = 0
+
+
+class CircuitBreaker:
+    """
+    Stops calling a host after BREAKER_FAILURES consecutive failures.
+
+    While open, calls are refused until the cooldown has passed. Then one trial
+    call is let through (half-open): success closes the breaker, failure opens
+    it again with a doubled cooldown, up to TRY_AGAIN_INTERVAL.
+    """
+
+    def __init__(self, host: str) -> None:
+        self.host = host
+        self.failures = 0
+        self.opened = 0
+        self.open_until = 0.0
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call to the host may be made now."""
+        with self.lock:
+            if self.failures < config.BREAKER_FAILURES:
+                return True
+            if time.monotonic() < self.open_until or self.trial_running:
+                return False
+            # Half-open: let a single trial call through
+            self.trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        with self.lock:
+            if self.failures >= config.BREAKER_FAILURES:
+                logger.info("Circuit closed", extra={"host": self.host})
+            self.failures = 0
+            self.opened = 0
+            self.trial_running = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.failures < config.BREAKER_FAILURES:
+                return
+            self.opened += 1
+            cooldown = backoff_delay(
+                self.opened,
+                config.BREAKER_COOLDOWN,
+                max(config.BREAKER_COOLDOWN, config.TRY_AGAIN_INTERVAL),
+            )
+            self.open_until = time.monotonic() + cooldown
+            logger.warning(
+                "Circuit open",
+                extra={"host": self.host, "retry_in": round(cooldown)},
+            )
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(url: str) -> CircuitBreaker:
+    """The circuit breaker shared by every request to the URL's host."""
+    host = urlparse(url).netloc
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host)
+        return breaker
+
+
+class NegativeCache:
+    """Remembers URLs that failed so they are not requested again every cycle."""
+
+    def __init__(self) -> None:
+        # url -> (monotonic expiry, consecutive failures)
+        self.entries: dict[str, tuple[float, int]] = {}
+        self.lock = threading.Lock()
+
+    def is_blocked(self, url: str) -> bool:
+        with self.lock:
+            entry = self.entries.get(url)
+            return entry is not None and time.monotonic() < entry[0]
+
+    def add(self, url: str, missing: bool = False) -> None:
+        """
+        Block a failed URL for a while.
+
+        Args:
+            url: The URL that failed
+            missing: The server said it does not exist (404/410), block it for
+                BADGE_NEGATIVE_TTL instead of backing off
+        """
+        with self.lock:
+            _expiry, failures = self.entries.get(url, (0.0, 0))
+            failures += 1
+            if missing:
+                ttl = float(config.BADGE_NEGATIVE_TTL)
+            else:
+                ttl = backoff_delay(
+                    failures, config.RETRY_BASE_DELAY, config.TRY_AGAIN_INTERVAL
+                )
+            self.entries[url] = (time.monotonic() + ttl, failures)
+
+    def discard(self, url: str) -> None:
+        with self.lock:
+            self.entries.pop(url, None)
+
+
+# Badge URLs that recently failed
+failed_badges = NegativeCache()
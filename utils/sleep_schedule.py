@@ -5,7 +5,9 @@ from datetime import datetime
 from datetime import time as dt_time
 from zoneinfo import ZoneInfo
 
-from config import SLEEP_END_TIME, SLEEP_START_TIME, TIMEZONE
+import config
+
+from . import metrics
 
 
 def parse_military_time(time_str: str) -> dt_time:
@@ -31,11 +33,16 @@ def is_sleep_time() -> bool:
     Returns:
         True if display should be sleeping, False otherwise
     """
-    tz = ZoneInfo(TIMEZONE)
+    with metrics.SLEEP_CHECK_SECONDS.time():
+        return _is_sleep_time()
+
+
+def _is_sleep_time() -> bool:
+    tz = ZoneInfo(config.TIMEZONE)
     current_time = datetime.now(tz).time()
 
-    sleep_start = parse_military_time(SLEEP_START_TIME)
-    sleep_end = parse_military_time(SLEEP_END_TIME)
+    sleep_start = parse_military_time(config.SLEEP_START_TIME)
+    sleep_end = parse_military_time(config.SLEEP_END_TIME)
 
     # Handle overnight sleep period (e.g., 23:00 to 07:00)
     if sleep_start > sleep_end:
@@ -52,10 +59,10 @@ def time_until_wake() -> int:
     Returns:
         Number of seconds to sleep
     """
-    tz = ZoneInfo(TIMEZONE)
+    tz = ZoneInfo(config.TIMEZONE)
     now = datetime.now(tz)
 
-    sleep_end = parse_military_time(SLEEP_END_TIME)
+    sleep_end = parse_military_time(config.SLEEP_END_TIME)
     wake_time = now.replace(
         hour=sleep_end.hour, minute=sleep_end.minute, second=0, microsecond=0
     )
@@ -70,9 +77,25 @@ def time_until_wake() -> int:
     return seconds
 
 
+def sleep_remaining(lead: float = 0) -> float:
+    """
+    Seconds until `lead` seconds before wake time, 0 outside the sleep window.
+    Pass it to config_reload.wait() so the wait follows a changed schedule.
+
+    Args:
+        lead: How long before wake time the wait ends (negative for after)
+
+    Returns:
+        Number of seconds to wait
+    """
+    if not is_sleep_time():
+        return 0
+    return time_until_wake() - lead
+
+
 if __name__ == "__main__":
-    print(f"Timezone: {TIMEZONE}")
-    print(f"Sleep schedule: {SLEEP_START_TIME} to {SLEEP_END_TIME}")
+    print(f"Timezone: {config.TIMEZONE}")
+    print(f"Sleep schedule: {config.SLEEP_START_TIME} to {config.SLEEP_END_TIME}")
     print(f"Is sleep time? {is_sleep_time()}")
 
     if is_sleep_time():
@@ -81,6 +104,6 @@ if __name__ == "__main__":
         minutes = (seconds % 3600) // 60
         print(f"Time until wake: {hours}h {minutes}m ({seconds} seconds)")
 
-    tz = ZoneInfo(TIMEZONE)
+    tz = ZoneInfo(config.TIMEZONE)
     current_time_str = datetime.now(tz).strftime("%Y-%m-%d %H:%M:%S %Z")
-    print(f"Current time ({TIMEZONE}): {current_time_str}")
+    print(f"Current time ({config.TIMEZONE}): {current_time_str}")
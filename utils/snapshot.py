@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Persist the last fetched scores so the next start can show a frame before
+anything is fetched (or even imported).
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from config import SNAPSHOT_FILE
+from models import Event, SportsData, Team
+
+logger = logging.getLogger(__name__)
+
+# The snapshot last written, to skip rewriting it (SD card wear)
+_last_written: bytes | None = None
+
+
+def _team_entry(team: Team) -> dict[str, Any]:
+    return {
+        "id": team.id,
+        "badge": team.badge,
+        "location": team.location,
+        "name": team.name,
+        "abbreviation": team.abbreviation,
+        "score": team.score,
+        "badge_path": str(team.badge_path) if team.badge_path else None,
+    }
+
+
+def _event_entry(event: Event) -> dict[str, Any]:
+    return {
+        "id": event.id,
+        "date": event.date,
+        "time": event.time,
+        "status": event.status,
+        "status_type": str(event.status_type),
+        "league": event.league,
+        "league_badge": event.league_badge,
+        "league_badge_path": (
+            str(event.league_badge_path) if event.league_badge_path else None
+        ),
+        "team_one": _team_entry(event.team_one),
+        "team_two": _team_entry(event.team_two),
+    }
+
+
+def _path(value: str | None) -> Path | None:
+    """A cached badge path, if the badge is still cached."""
+    if not value:
+        return None
+    path = Path(value)
+    return path if path.exists() else None
+
+
+def save_snapshot(data: SportsData) -> None:
+    """
+    Write the scores to SNAPSHOT_FILE (atomically, and only when they changed).
+
+    Args:
+        data: The scores just fetched
+    """
+    global _last_written
+    payload = json.dumps(
+        {"events": [_event_entry(event) for event in data.events]},
+        separators=(",", ":"),
+    ).encode()
+    if payload == _last_written:
+        return
+
+    try:
+        SNAPSHOT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = SNAPSHOT_FILE.with_suffix(".tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, SNAPSHOT_FILE)
+        _last_written = payload
+    except OSError as e:
+        logger.warning(
+            "Error writing snapshot", extra={"path": SNAPSHOT_FILE, "error": e}
+        )
+
+
+def load_snapshot() -> SportsData | None:
+    """
+    Read the scores saved by save_snapshot().
+
+    Returns:
+        The saved scores with their cached badges, or None if there is no
+        usable snapshot
+    """
+    try:
+        payload = json.loads(SNAPSHOT_FILE.read_bytes())
+        events = []
+        for entry in payload["events"]:
+            teams = []
+            for key in ("team_one", "team_two"):
+                team = dict(entry[key])
+                team["badge_path"] = _path(team["badge_path"])
+                teams.append(Team(**team))
+            event = dict(entry, team_one=teams[0], team_two=teams[1])
+            event["league_badge_path"] = _path(event["league_badge_path"])
+            events.append(Event(**event))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(
+            "Error reading snapshot", extra={"path": SNAPSHOT_FILE, "error": e}
+        )
+        return None
+    return SportsData(events=events)
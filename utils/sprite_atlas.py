@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Packed sprite atlas: badges resized to display size and color corrected,
+stored as raw RGB in one file and memory-mapped.
+
+    atlas.bin   the generation of the file, then the sprites' pixels appended
+                one after the other
+    atlas.json  index: "<url hash>:<size>:<color table>" -> [offset, width, height]
+    atlas.lock  serializes writers (flock), readers never lock
+
+A lookup copies the sprite's bytes out of the mapping (page cache) into a new
+image: no file read and no PNG/JPEG decode. The file is only appended to, so
+every process (and every restart) can keep its mapping open and shares the
+same pages. When it grows past ATLAS_MAX_MB a fresh file replaces it; old
+mappings stay valid until their owners notice the new generation. A reader
+whose index is older than the file it maps finds a different generation in
+the file's header, and treats the lookup as a miss.
+"""
+
+import contextlib
+import fcntl
+import json
+import logging
+import mmap
+import os
+import secrets
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+from PIL import Image
+
+from config import ATLAS_DIR, ATLAS_MAX_MB, SPRITE_ATLAS
+
+from .color import lut_signature
+
+logger = logging.getLogger(__name__)
+
+# Layout of atlas.bin and atlas.json, older atlases are started over
+ATLAS_FORMAT = 2
+# The generation, as hex, at the start of atlas.bin
+HEADER_SIZE = 16
+
+
+class SpriteAtlas:
+    """An append-only file of raw RGB sprites with a JSON index."""
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.data_path = directory / "atlas.bin"
+        self.index_path = directory / "atlas.json"
+        self.lock_path = directory / "atlas.lock"
+        self.max_bytes = max_bytes
+        self.generation: str | None = None
+        # key -> [offset, width, height]
+        self.sprites: dict[str, list[int]] = {}
+        self.index_mtime: int | None = None
+        self.mapped: mmap.mmap | None = None
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Image.Image | None:
+        """
+        Look a sprite up.
+
+        Args:
+            key: The sprite key, see sprite_key()
+
+        Returns:
+            The RGB sprite, or None if it is not in the atlas
+        """
+        with self.lock:
+            entry = self.sprites.get(key)
+            if entry is None:
+                # Another process may have added it
+                self._reload_index()
+                entry = self.sprites.get(key)
+                if entry is None:
+                    return None
+
+            offset, width, height = entry
+            data = self._read(offset, width * height * 3)
+            if data is None:
+                return None
+            return Image.frombytes("RGB", (width, height), data)
+
+    def put(self, key: str, sprite: Image.Image) -> None:
+        """
+        Append a sprite (no-op if another process already added it).
+
+        Args:
+            key: The sprite key, see sprite_key()
+            sprite: The RGB sprite
+        """
+        data = sprite.tobytes()
+        try:
+            with self.lock, self._file_lock():
+                self._reload_index()
+                if key in self.sprites:
+                    return
+                size = self.data_path.stat().st_size if self.data_path.exists() else 0
+                if (
+                    self.generation is None
+                    or size + len(data) > self.max_bytes
+                    or not self.data_path.exists()
+                ):
+                    self._reset()
+
+                with open(self.data_path, "ab") as f:
+                    offset = f.tell()
+                    f.write(data)
+                self.sprites[key] = [offset, sprite.width, sprite.height]
+                self._write_index()
+        except OSError as e:
+            logger.warning("Error writing sprite atlas", extra={"error": e})
+
+    @contextlib.contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _reload_index(self) -> None:
+        """Read the index again if a writer changed it."""
+        try:
+            mtime = self.index_path.stat().st_mtime_ns
+            if mtime == self.index_mtime:
+                return
+            index = json.loads(self.index_path.read_bytes())
+        except (OSError, ValueError):
+            return
+        self.index_mtime = mtime
+        if index.get("format") != ATLAS_FORMAT:
+            # Written by an older version, put() starts a new atlas
+            self._unmap()
+            self.generation = None
+            self.sprites = {}
+            return
+        if index["generation"] != self.generation:
+            # The data file was replaced, map the new one
+            self._unmap()
+        self.generation = index["generation"]
+        self.sprites = index["sprites"]
+
+    def _write_index(self) -> None:
+        tmp_path = self.index_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "format": ATLAS_FORMAT,
+                    "generation": self.generation,
+                    "sprites": self.sprites,
+                }
+            )
+        )
+        os.replace(tmp_path, self.index_path)
+        self.index_mtime = self.index_path.stat().st_mtime_ns
+
+    def _reset(self) -> None:
+        """Start a new, empty atlas file (existing mappings keep the old one)."""
+        generation = secrets.token_hex(HEADER_SIZE // 2)
+        tmp_path = self.data_path.with_suffix(".tmp")
+        tmp_path.write_bytes(generation.encode())
+        os.replace(tmp_path, self.data_path)
+        self._unmap()
+        self.generation = generation
+        self.sprites = {}
+        self._write_index()
+        logger.info("Sprite atlas started", extra={"path": self.data_path})
+
+    def _read(self, offset: int, size: int) -> bytes | None:
+        """
+        Copy bytes out of the mapped file, remapping it if it grew since.
+        None if the file is from another generation than the index.
+        """
+        if self.mapped is None or offset + size > len(self.mapped):
+            self._unmap()
+            try:
+                with open(self.data_path, "rb") as f:
+                    if os.fstat(f.fileno()).st_size < offset + size:
+                        return None
+                    self.mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except OSError:
+                return None
+        data = self.mapped[offset : offset + size]
+        # Another process may have started a new atlas since the index was read,
+        # the slot then holds other pixels: check the file's generation once
+        # the bytes are copied, and pick up the new index
+        if self.mapped[:HEADER_SIZE] != (self.generation or "").encode():
+            self._unmap()
+            self.index_mtime = None
+            self._reload_index()
+            return None
+        return data
+
+    def _unmap(self) -> None:
+        if self.mapped is not None:
+            self.mapped.close()
+            self.mapped = None
+
+
+_atlas = SpriteAtlas(ATLAS_DIR, ATLAS_MAX_MB * 1024 * 1024) if SPRITE_ATLAS else None
+
+
+def sprite_key(path: Path, max_size: int) -> str:
+    """The atlas key of an image file resized to max_size and color corrected."""
+    # Badge files are named after the hash of their URL
+    return f"{path.stem}:{max_size}:{lut_signature()}"
+
+
+def get_sprite(path: Path, max_size: int) -> Image.Image | None:
+    """The sprite from the atlas, or None if it is not there (or disabled)."""
+    if _atlas is None:
+        return None
+    return _atlas.get(sprite_key(path, max_size))
+
+
+def put_sprite(path: Path, max_size: int, sprite: Image.Image) -> None:
+    """Add a sprite to the atlas (no-op if disabled)."""
+    if _atlas is not None:
+        _atlas.put(sprite_key(path, max_size), sprite)
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""Times the startup phases, up to the first frame and the main loop."""
+
+import contextlib
+import logging
+import time
+from collections.abc import Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Records how long each startup phase took."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def report(self) -> None:
+        """Log the phase durations and the total (seconds)."""
+        fields = {name: round(seconds, 3) for name, seconds in self.phases.items()}
+        fields["total"] = round(time.perf_counter() - self.started, 3)
+        logger.info("Startup timing", extra=fields)
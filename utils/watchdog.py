@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Stall watchdog for the display loop and the score fetches.
+
+The display reports each frame shown and how long the screen is held, the
+runtimes report each successful fetch. The board is stalled when a frame is
+more than FRAME_SLO seconds late, or no fetch succeeded for FETCH_SLO seconds.
+Under systemd (Type=notify with WatchdogSec) WATCHDOG=1 heartbeats are sent
+only while the board is healthy, so a hung request or render loop gets the
+service restarted instead of leaving a frozen frame on the panel. The thread
+stacks are logged when a stall starts, to see where it hangs.
+
+While the display sleeps there are no frames to expect, the checks are
+suspended until it wakes.
+"""
+
+import faulthandler
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+
+import config
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks (and heartbeats, unless systemd wants them sooner)
+CHECK_INTERVAL = 5.0
+
+_lock = threading.Lock()
+# Monotonic times: last frame shown, when the next one is due, last good fetch
+_last_frame = _frame_due = _last_fetch = time.monotonic()
+_suspended = False
+
+
+def frame_shown() -> None:
+    """A frame was swapped onto the display."""
+    global _last_frame, _frame_due
+    with _lock:
+        _last_frame = _frame_due = time.monotonic()
+
+
+def hold_frame(seconds: float) -> None:
+    """
+    No new frame is expected for a while (a screen hold or a retry wait).
+
+    Args:
+        seconds: How long from now until the next frame
+    """
+    global _frame_due
+    with _lock:
+        _frame_due = max(_frame_due, time.monotonic() + seconds)
+
+
+def fetch_succeeded() -> None:
+    """Scores were fetched (or received from the hub)."""
+    global _last_fetch
+    with _lock:
+        _last_fetch = time.monotonic()
+
+
+def suspend() -> None:
+    """Stop checking, the display is going to sleep."""
+    global _suspended
+    with _lock:
+        _suspended = True
+
+
+def resume() -> None:
+    """Check again, starting the clocks over (the display woke up)."""
+    global _suspended, _last_frame, _frame_due, _last_fetch
+    with _lock:
+        _suspended = False
+        _last_frame = _frame_due = _last_fetch = time.monotonic()
+
+
+def stalls() -> dict[str, float]:
+    """
+    Compare the frame and fetch times with their SLOs.
+
+    Returns:
+        What is stalled ("frame" and/or "fetch") -> seconds since the last one
+        (empty while healthy)
+    """
+    now = time.monotonic()
+    with _lock:
+        if _suspended:
+            return {}
+        frame_late = now - _frame_due
+        frame_age = now - _last_frame
+        fetch_age = now - _last_fetch
+
+    stalled: dict[str, float] = {}
+    if config.FRAME_SLO and frame_late > config.FRAME_SLO:
+        stalled["frame"] = round(frame_age)
+    if config.FETCH_SLO and fetch_age > config.FETCH_SLO:
+        stalled["fetch"] = round(fetch_age)
+    return stalled
+
+
+def sd_notify(message: str) -> bool:
+    """
+    Send a state change to systemd (see sd_notify(3)).
+
+    Args:
+        message: e.g. "READY=1" or "WATCHDOG=1"
+
+    Returns:
+        True if sent, False when not run by systemd or on error
+    """
+    address = os.environ.get("NOTIFY_SOCKET")
+    if not address:
+        return False
+    if address.startswith("@"):
+        # Abstract socket namespace
+        address = "\0" + address[1:]
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.connect(address)
+            sock.sendall(message.encode())
+    except OSError as e:
+        logger.warning("Error notifying systemd", extra={"error": e})
+        return False
+    return True
+
+
+def log_thread_stacks() -> None:
+    """Log where every thread is, one record per thread."""
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    for ident, frame in sys._current_frames().items():
+        logger.error(
+            "Thread stack",
+            extra={
+                "thread_name": names.get(ident, ident),
+                "stack": "".join(traceback.format_stack(frame)),
+            },
+        )
+
+
+def _heartbeat_interval() -> float:
+    """CHECK_INTERVAL, or half the systemd watchdog timeout if that is shorter."""
+    usec = os.environ.get("WATCHDOG_USEC")
+    pid = os.environ.get("WATCHDOG_PID")
+    if not usec or (pid and int(pid) != os.getpid()):
+        return CHECK_INTERVAL
+    return min(CHECK_INTERVAL, int(usec) / 2_000_000)
+
+
+def _watch(interval: float) -> None:
+    stalled_before: dict[str, float] = {}
+    while True:
+        stalled = stalls()
+        if stalled and not stalled_before:
+            logger.error("Board stalled", extra={"since": stalled})
+            for kind in stalled:
+                metrics.WATCHDOG_STALLS.inc(kind=kind)
+            log_thread_stacks()
+            sd_notify(f"STATUS=Stalled: {', '.join(stalled)}")
+        elif stalled_before and not stalled:
+            logger.info("Board recovered from stall")
+            sd_notify("STATUS=Running")
+        if not stalled:
+            sd_notify("WATCHDOG=1")
+        stalled_before = stalled
+        time.sleep(interval)
+
+
+def start_watchdog() -> None:
+    """
+    Tell systemd the service is up and start the watchdog thread. If systemd
+    kills the service anyway (SIGABRT), faulthandler writes the stacks to
+    stderr, even when a thread holds the GIL.
+    """
+    faulthandler.enable()
+    interval = _heartbeat_interval()
+    sd_notify("READY=1")
+    threading.Thread(
+        target=_watch, args=(interval,), name="watchdog", daemon=True
+    ).start()
+    logger.info(
+        "Watchdog started",
+        extra={
+            "frame_slo": config.FRAME_SLO,
+            "fetch_slo": config.FETCH_SLO,
+            "interval": interval,
+        },
+    )